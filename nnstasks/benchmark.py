@@ -0,0 +1,376 @@
+import sys
+import io
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import subprocess
+import contextlib
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import nntask2
+import nntask3
+import nntask4
+import nntask5
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+NUMBER = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+TIME_NOISE = 0.05
+PEAK_LAUNCHER = '''
+import os, sys, atexit, runpy, resource
+peak_file, sys.argv = sys.argv[1], sys.argv[2:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+def report_peak():
+    try:
+        with open('/proc/self/status') as status:
+            peak = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(peak_file, 'w') as f:
+        f.write(str(peak))
+atexit.register(report_peak)
+runpy.run_path(sys.argv[0], run_name='__main__')
+'''
+
+def parse_args():
+    args = sys.argv[1:]
+    params = {'task': 'train', 'samples': 2000, 'sizes': '16,32,8', 'epochs': 1, 'batch': 32, 'seed': 0, 'depths': '1000,10000,100000', 'fanins': '1,2,8', 'widths': '1000,100000', 'levels': 8, 'workers': 4, 'tolerance': '1e-4', 'workers_list': '1,2,4', 'size': 2000, 'shapes': 'deep,wide,dense', 'repeat': 1, 'baseline': 'benchmark_baseline.json', 'update': 0, 'slowdown': '0.25', 'workdir': ''}
+    for arg in args:
+        if '=' not in arg:
+            print(f"Ошибка: неверный формат аргумента '{arg}'.")
+            sys.exit(1)
+        key, value = arg.split('=', 1)
+        if key not in params:
+            print(f"Ошибка: неизвестный параметр '{key}'.")
+            sys.exit(1)
+        params[key] = value if isinstance(params[key], str) else int(value)
+    return params
+
+def make_layers(sizes, rng):
+    layers = []
+    for inputs_count, neurons in zip(sizes[:-1], sizes[1:]):
+        w = rng.uniform(-0.5, 0.5, (neurons, inputs_count))
+        layers.append({'weights': w, 'neurons': neurons, 'inputs_count': inputs_count, 'inputs': np.zeros(inputs_count), 'outputs': np.zeros(neurons), 'derivatives': np.zeros(neurons)})
+    return layers
+
+def copy_layers(layers):
+    return [dict(layer, weights=layer['weights'].copy(), outputs=np.zeros(layer['neurons']), derivatives=np.zeros(layer['neurons'])) for layer in layers]
+
+def timed(func, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    return time.perf_counter() - start, result
+
+def bench_train(params):
+    rng = np.random.default_rng(params['seed'])
+    sizes = [int(s) for s in params['sizes'].split(',')]
+    inputs = rng.uniform(0, 1, (params['samples'], sizes[0]))
+    outputs = rng.uniform(0, 1, (params['samples'], sizes[-1]))
+    layers = make_layers(sizes, rng)
+    loop_time, loop_history = timed(nntask5.train, copy_layers(layers), inputs, outputs, params['epochs'], 0.1, 0.0)
+    one_time, one_history = timed(nntask5.train_batched, copy_layers(layers), inputs, outputs, params['epochs'], 0.1, 0.0, 1)
+    batch_time, _ = timed(nntask5.train_batched, copy_layers(layers), inputs, outputs, params['epochs'], 0.1, 0.0, params['batch'])
+    drift = max(abs(a - b) for a, b in zip(loop_history, one_history))
+    print(f"Сеть {sizes}, примеров: {params['samples']}, эпох: {params['epochs']}")
+    print(f"Поэлементный цикл:        {loop_time:.4f} с")
+    print(f"Пакетный режим, batch=1:  {one_time:.4f} с (ускорение {loop_time / one_time:.1f}x, расхождение ошибки {drift:.2e})")
+    print(f"Пакетный режим, batch={params['batch']}: {batch_time:.4f} с (ускорение {loop_time / batch_time:.1f}x)")
+
+def make_chain_graph(depth, fanin):
+    vertices = set()
+    arcs = []
+    operations = {}
+    for level in range(depth):
+        vertex = f'v{level}'
+        vertices.add(vertex)
+        operations[vertex] = '+'
+        children = [f'l{level}_{k}' for k in range(fanin - 1)]
+        if level > 0:
+            children.insert(0, f'v{level - 1}')
+        elif not children:
+            children = ['l0_0']
+        for order, child in enumerate(children, 1):
+            if child not in vertices:
+                vertices.add(child)
+                if child.startswith('l'):
+                    operations[child] = '1'
+            arcs.append({'from': child, 'to': vertex, 'order': order})
+    return vertices, arcs, operations
+
+def serialize(vertices, arcs):
+    return nntask2.output(nntask2.index_from_arcs(list(vertices), arcs))
+
+def measure(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def bench_graph(params):
+    print(f"{'глубина':>10} {'вход':>6} {'вершин':>10} {'nntask3, с':>12} {'пик, МБ':>10} {'nntask2, с':>12} {'пик, МБ':>10}")
+    for depth in [int(d) for d in params['depths'].split(',')]:
+        for fanin in [int(f) for f in params['fanins'].split(',')]:
+            vertices, arcs, operations = make_chain_graph(depth, fanin)
+            eval_time, eval_peak = measure(nntask3.evaluate_function, vertices, arcs, operations)
+            output_time, output_peak = measure(serialize, vertices, arcs)
+            print(f"{depth:>10} {fanin:>6} {len(vertices):>10} {eval_time:>12.4f} {eval_peak / 2**20:>10.1f} {output_time:>12.4f} {output_peak / 2**20:>10.1f}")
+
+def make_layered_graph(levels, width, fanin):
+    vertices = {f'x{j}' for j in range(width)}
+    operations = {f'x{j}': '0.5' for j in range(width)}
+    arcs = []
+    previous = [f'x{j}' for j in range(width)]
+    for level in range(1, levels + 1):
+        current = [f'n{level}_{j}' for j in range(width)]
+        for j, vertex in enumerate(current):
+            vertices.add(vertex)
+            operations[vertex] = '+' if level % 2 else '*'
+            for k in range(fanin):
+                arcs.append({'from': previous[(j + k) % width], 'to': vertex, 'order': k + 1})
+        previous = current
+    vertices.add('sink')
+    operations['sink'] = '+'
+    arcs.extend({'from': vertex, 'to': 'sink', 'order': j + 1} for j, vertex in enumerate(previous))
+    return vertices, arcs, operations
+
+def bench_levels(params):
+    shapes = [('широкий', width, make_layered_graph(params['levels'], width, 2)) for width in [int(w) for w in params['widths'].split(',')]]
+    shapes += [('глубокий', depth, make_chain_graph(depth, 2)) for depth in [int(d) for d in params['depths'].split(',')]]
+    print(f"{'граф':<10} {'размер':>8} {'вершин':>10} {'dfs, с':>10} {'levels, с':>10} {'parallel, с':>12}")
+    with ProcessPoolExecutor(params['workers']) as executor:
+        for name, size, (vertices, arcs, operations) in shapes:
+            start = time.perf_counter()
+            expected = nntask3.evaluate_function(vertices, arcs, operations)
+            dfs_time = time.perf_counter() - start
+            _, sorted_vertices = nntask3.detect_cycles(vertices, arcs)
+            plan = nntask3.compile_plan(vertices, arcs, sorted_vertices)
+            levels = nntask3.compile_levels(plan)
+            start = time.perf_counter()
+            serial = nntask3.evaluate_levels(plan, levels, operations)
+            serial_time = time.perf_counter() - start
+            start = time.perf_counter()
+            parallel = nntask3.evaluate_levels(plan, levels, operations, executor, params['workers'], threshold=1000)
+            parallel_time = time.perf_counter() - start
+            if not np.isclose(expected, serial) or not np.isclose(expected, parallel):
+                print(f"Ошибка: результаты расходятся: {expected}, {serial}, {parallel}")
+                sys.exit(1)
+            print(f"{name:<10} {size:>8} {len(vertices):>10} {dfs_time:>10.4f} {serial_time:>10.4f} {parallel_time:>12.4f}")
+
+def bench_precision(params):
+    rng = np.random.default_rng(params['seed'])
+    sizes = [int(s) for s in params['sizes'].split(',')]
+    tolerance = float(params['tolerance'])
+    inputs = rng.uniform(-1, 1, (params['samples'], sizes[0]))
+    outputs = rng.uniform(0, 1, (params['samples'], sizes[-1]))
+    matrices = [rng.uniform(-0.5, 0.5, (n, m)) for m, n in zip(sizes[:-1], sizes[1:])]
+    times = {}
+    results = {}
+    for dtype in (np.float64, np.float32):
+        typed = [matrix.astype(dtype) for matrix in matrices]
+        start = time.perf_counter()
+        results[dtype] = nntask4.network_batch(typed, inputs.astype(dtype))
+        times[dtype] = time.perf_counter() - start
+    inference_error = float(np.max(np.abs(results[np.float64] - results[np.float32])))
+    histories = {}
+    for dtype in (np.float64, np.float32):
+        layers = copy_layers(make_layers(sizes, np.random.default_rng(params['seed'])))
+        for layer in layers:
+            layer['weights'] = layer['weights'].astype(dtype)
+        _, histories[dtype] = timed(nntask5.train_batched, layers, inputs.astype(dtype), outputs.astype(dtype), params['epochs'], 0.1, 0.0, params['batch'])
+    training_error = max(abs(a - b) for a, b in zip(histories[np.float64], histories[np.float32]))
+    extreme = nntask4.sigmoid(np.array([-1000.0, 0.0, 1000.0], dtype=np.float32))
+    print(f"Сеть {sizes}, примеров: {params['samples']}")
+    print(f"Инференс float64: {times[np.float64]:.4f} с, float32: {times[np.float32]:.4f} с, макс. расхождение выходов {inference_error:.2e}")
+    print(f"Обучение, {params['epochs']} эпох: макс. расхождение ошибки {training_error:.2e}")
+    print(f"Сигмоида на ±1000 (float32): {extreme}")
+    if inference_error > tolerance or training_error > tolerance or not np.all(np.isfinite(extreme)):
+        print(f"Ошибка: точность float32 хуже допустимой ({tolerance}).")
+        sys.exit(1)
+
+def bench_parallel(params):
+    rng = np.random.default_rng(params['seed'])
+    sizes = [int(s) for s in params['sizes'].split(',')]
+    inputs = rng.uniform(0, 1, (params['samples'], sizes[0]))
+    outputs = rng.uniform(0, 1, (params['samples'], sizes[-1]))
+    layers = make_layers(sizes, rng)
+    serial_time, serial_history = timed(nntask5.train_batched, copy_layers(layers), inputs, outputs, params['epochs'], 0.1, 0.0, params['batch'])
+    print(f"Сеть {sizes}, примеров: {params['samples']}, эпох: {params['epochs']}, batch={params['batch']}")
+    print(f"{'процессов':>10} {'время, с':>10} {'ускорение':>10} {'расхождение':>12}")
+    print(f"{'serial':>10} {serial_time:>10.4f} {1.0:>10.2f} {0.0:>12.2e}")
+    for workers in [int(w) for w in params['workers_list'].split(',')]:
+        elapsed, history = timed(nntask5.train_parallel, copy_layers(layers), inputs, outputs, params['epochs'], 0.1, 0.0, params['batch'], workers)
+        drift = max(abs(a - b) for a, b in zip(serial_history, history))
+        print(f"{workers:>10} {elapsed:>10.4f} {serial_time / elapsed:>10.2f} {drift:>12.2e}")
+
+GRAPH_SHAPES = {
+    'deep': lambda size: make_chain_graph(size, 2),
+    'wide': lambda size: make_layered_graph(3, size, 2),
+    'dense': lambda size: make_layered_graph(3, max(size // 20, 8), 8),
+}
+
+NETWORK_SHAPES = {
+    'deep': [16] * 9 + [4],
+    'wide': [16, 512, 4],
+    'dense': [128, 128, 128, 128],
+}
+
+def write_edges(path, arcs):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(', '.join(f"({arc['from']}, {arc['to']}, {arc['order']})" for arc in arcs))
+
+def write_operations(path, operations):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n' + ''.join(f'{vertex}: {operation}\n' for vertex, operation in sorted(operations.items())) + '}\n')
+
+def format_matrix(matrix):
+    return '[' + ', '.join('[' + ', '.join(map(str, row)) + ']' for row in np.round(matrix, 6).tolist()) + ']'
+
+def write_weights(path, matrices):
+    with open(path, 'w') as f:
+        f.write(''.join(f'w{i}: {format_matrix(matrix)}\n' for i, matrix in enumerate(matrices, 1)))
+
+def write_dataset(path, inputs, outputs):
+    with open(path, 'w') as f:
+        f.write(f'x: {format_matrix(inputs)}\ny: {format_matrix(outputs)}\n')
+
+def write_vectors(path, inputs):
+    with open(path, 'w') as f:
+        f.write(''.join(', '.join(map(str, row)) + '\n' for row in np.round(inputs, 6).tolist()))
+
+def write_params(path, params):
+    with open(path, 'w') as f:
+        f.write(''.join(f'{key}={value}\n' for key, value in params.items()))
+
+def generate_graph_case(workdir, shape, size):
+    vertices, arcs, operations = GRAPH_SHAPES[shape](size)
+    write_edges(os.path.join(workdir, 'edges.txt'), arcs)
+    write_operations(os.path.join(workdir, 'operations.txt'), operations)
+    return [
+        ('nntask1', ['input1=edges.txt', 'output1=graph.json'], ['graph.json']),
+        ('nntask2', ['input1=graph.json', 'output1=function.txt'], ['function.txt']),
+        ('nntask3', ['input1=edges.txt', 'input2=operations.txt', 'output=value.txt'], ['value.txt']),
+        ('pipeline', ['input1=edges.txt', 'input2=operations.txt', 'output=pipeline.txt'], ['pipeline.txt']),
+    ]
+
+def generate_network_case(workdir, shape, params):
+    rng = np.random.default_rng(params['seed'])
+    sizes = NETWORK_SHAPES[shape]
+    matrices = [rng.uniform(-0.5, 0.5, (n, m)) for m, n in zip(sizes[:-1], sizes[1:])]
+    inputs = rng.uniform(0, 1, (params['samples'], sizes[0]))
+    outputs = rng.uniform(0, 1, (params['samples'], sizes[-1]))
+    write_weights(os.path.join(workdir, 'weights.txt'), matrices)
+    write_vectors(os.path.join(workdir, 'vectors.txt'), inputs)
+    write_dataset(os.path.join(workdir, 'data.txt'), inputs, outputs)
+    write_params(os.path.join(workdir, 'params.txt'), {'epoch': params['epochs'], 'alpha': 0.1, 'eps': 0.0, 'batch': params['batch']})
+    return [
+        ('nntask4', ['input1=weights.txt', 'input2=vectors.txt', 'output1=vectors_out.txt', 'output2=network.json', f"batch={params['batch']}"], ['vectors_out.txt', 'network.json']),
+        ('nntask5', ['input1=weights.txt', 'input2=data.txt', 'input3=params.txt', 'output1=history.txt'], ['history.txt']),
+    ]
+
+def run_entry(workdir, script, args):
+    log_file, peak_file = os.path.join(workdir, 'stdout.log'), os.path.join(workdir, 'peak.txt')
+    with open(log_file, 'w') as log:
+        start = time.perf_counter()
+        returncode = subprocess.call([sys.executable, '-c', PEAK_LAUNCHER, peak_file, os.path.join(SCRIPTS_DIR, script + '.py')] + args, cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        elapsed = time.perf_counter() - start
+    if returncode:
+        with open(log_file) as log:
+            print(f"Ошибка: {script} завершился с кодом {returncode}:\n{log.read()}")
+        sys.exit(1)
+    with open(peak_file) as f:
+        return elapsed, int(f.read()) / 1024
+
+def fingerprint(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    except FileNotFoundError:
+        print(f"Ошибка: выходной файл '{path}' не создан.")
+        sys.exit(1)
+    values = np.array([float(value) for value in NUMBER.findall(text)])
+    skeleton = NUMBER.sub('#', text)
+    return {'digest': hashlib.sha256(skeleton.encode('utf-8')).hexdigest()[:16], 'count': len(values), 'sum': float(values.sum()), 'norm': float(np.sqrt(np.sum(values ** 2)))}
+
+def compare_result(result, expected, slowdown, tolerance):
+    problems = []
+    if result['seconds'] - expected['seconds'] > max(slowdown * expected['seconds'], TIME_NOISE):
+        problems.append(f"время {expected['seconds']:.3f} -> {result['seconds']:.3f} с")
+    if result['peak_mb'] > expected['peak_mb'] * (1 + slowdown):
+        problems.append(f"память {expected['peak_mb']:.1f} -> {result['peak_mb']:.1f} МБ")
+    for name, value in result['outputs'].items():
+        base = expected['outputs'].get(name)
+        if base is None or value['digest'] != base['digest'] or value['count'] != base['count'] or not np.allclose([value['sum'], value['norm']], [base['sum'], base['norm']], rtol=tolerance, atol=tolerance):
+            problems.append(f"результат {name} изменился")
+    return problems
+
+def run_suite(params, workdir):
+    results = {}
+    for shape in params['shapes'].split(','):
+        if shape not in GRAPH_SHAPES:
+            print(f"Ошибка: неизвестная форма '{shape}'. Доступны: {', '.join(GRAPH_SHAPES)}")
+            sys.exit(1)
+        cases = [('graph', generate_graph_case(workdir, shape, params['size'])), ('network', generate_network_case(workdir, shape, params))]
+        for kind, entries in cases:
+            for script, args, outputs in entries:
+                runs = [run_entry(workdir, script, args) for _ in range(max(params['repeat'], 1))]
+                results[f'{kind}/{shape}/{script}'] = {'seconds': min(run[0] for run in runs), 'peak_mb': max(run[1] for run in runs), 'outputs': {name: fingerprint(os.path.join(workdir, name)) for name in outputs}}
+    return results
+
+def bench_suite(params):
+    if params['workdir']:
+        os.makedirs(params['workdir'], exist_ok=True)
+        results = run_suite(params, params['workdir'])
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run_suite(params, workdir)
+    baseline = None
+    if not params['update'] and os.path.exists(params['baseline']):
+        with open(params['baseline'], encoding='utf-8') as f:
+            baseline = json.load(f)
+    slowdown, tolerance = float(params['slowdown']), float(params['tolerance'])
+    regressions = 0
+    print(f"Размер графов: {params['size']}, примеров: {params['samples']}, эпох: {params['epochs']}, batch={params['batch']}")
+    print(f"{'сценарий':<26} {'время, с':>10} {'пик, МБ':>10} {'база, с':>10}  статус")
+    for key, result in results.items():
+        expected = baseline.get(key) if baseline else None
+        problems = compare_result(result, expected, slowdown, tolerance) if expected else []
+        regressions += bool(problems)
+        status = '; '.join(problems) if problems else ('ok' if expected else '-')
+        base_time = f"{expected['seconds']:.4f}" if expected else '-'
+        print(f"{key:<26} {result['seconds']:>10.4f} {result['peak_mb']:>10.1f} {base_time:>10}  {status}")
+    if params['update']:
+        with open(params['baseline'], 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"Базовые результаты сохранены в файл {params['baseline']}")
+    elif baseline is None:
+        print(f"Базовые результаты '{params['baseline']}' не найдены, сравнение пропущено (update=1 сохранит текущие).")
+    if regressions:
+        print(f"Ошибка: обнаружено регрессий: {regressions}")
+        sys.exit(1)
+
+BENCHMARKS = {
+    'train': bench_train,
+    'graph': bench_graph,
+    'levels': bench_levels,
+    'precision': bench_precision,
+    'parallel': bench_parallel,
+    'suite': bench_suite,
+}
+
+def main():
+    params = parse_args()
+    if params['task'] not in BENCHMARKS:
+        print(f"Ошибка: неизвестный бенчмарк '{params['task']}'. Доступны: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+    BENCHMARKS[params['task']](params)
+
+if __name__ == '__main__':
+    main()
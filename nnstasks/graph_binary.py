@@ -0,0 +1,82 @@
+import sys
+import numpy as np
+
+GRAPH_MAGIC = b'NNGRAPH1'
+GRAPH_HEADER = np.dtype([('magic', 'S8'), ('vertices', '<i8'), ('arcs', '<i8'), ('names', '<i8')])
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+def padded(size):
+    return (size + 7) // 8 * 8
+
+def write_graph(output_file, names, from_ids, to_ids, orders):
+    from_ids = np.asarray(from_ids, dtype=np.int32)
+    to_ids = np.asarray(to_ids, dtype=np.int32)
+    orders = np.asarray(orders, dtype=np.int64)
+    if len(orders) and (orders.min() < INT32_MIN or orders.max() > INT32_MAX):
+        print("Ошибка: порядок дуги не помещается в int32.")
+        sys.exit(1)
+    encoded = [name.encode('utf-8') for name in names]
+    name_offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum([len(name) for name in encoded], out=name_offsets[1:])
+    blob = b''.join(encoded)
+    permutation = np.lexsort((orders, to_ids))
+    row_ptr = np.zeros(len(names) + 1, dtype='<i8')
+    np.cumsum(np.bincount(to_ids, minlength=len(names)), out=row_ptr[1:])
+    header = np.array([(GRAPH_MAGIC, len(names), len(orders), len(blob))], dtype=GRAPH_HEADER)
+    try:
+        with open(output_file, 'wb') as f:
+            f.write(header.tobytes())
+            f.write(name_offsets.tobytes())
+            f.write(blob + b'\0' * (padded(len(blob)) - len(blob)))
+            f.write(row_ptr.tobytes())
+            for column in (from_ids, to_ids, orders):
+                data = column[permutation].astype('<i4').tobytes()
+                f.write(data + b'\0' * (padded(len(data)) - len(data)))
+    except IOError:
+        print(f"Ошибка: не удалось записать файл '{output_file}'.")
+        sys.exit(1)
+
+def is_binary_graph(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(GRAPH_MAGIC)) == GRAPH_MAGIC
+    except FileNotFoundError:
+        print(f"Ошибка: файл '{path}' не найден.")
+        sys.exit(1)
+
+def load_graph(path):
+    try:
+        header = np.fromfile(path, dtype=GRAPH_HEADER, count=1)[0]
+        vertex_count, arc_count, names_size = int(header['vertices']), int(header['arcs']), int(header['names'])
+        offset = GRAPH_HEADER.itemsize
+        name_offsets = np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(vertex_count + 1,))
+        offset += name_offsets.nbytes
+        blob = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(names_size,)).tobytes() if names_size else b''
+        offset += padded(names_size)
+        row_ptr = np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(vertex_count + 1,))
+        offset += row_ptr.nbytes
+        columns = []
+        for _ in range(3):
+            columns.append(np.memmap(path, dtype='<i4', mode='r', offset=offset, shape=(arc_count,)) if arc_count else np.zeros(0, dtype='<i4'))
+            offset += padded(4 * arc_count)
+    except (IndexError, ValueError) as e:
+        print(f"Ошибка: файл '{path}' имеет некорректный формат: {e}")
+        sys.exit(1)
+    names = [blob[name_offsets[i]:name_offsets[i + 1]].decode('utf-8') for i in range(vertex_count)]
+    return {'names': names, 'row_ptr': row_ptr, 'from': columns[0], 'to': columns[1], 'order': columns[2]}
+
+class ArcView:
+    def __init__(self, graph, chunk_size=1 << 16):
+        self.graph = graph
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return len(self.graph['order'])
+
+    def __iter__(self):
+        names = self.graph['names']
+        for start in range(0, len(self), self.chunk_size):
+            end = start + self.chunk_size
+            chunk = zip(self.graph['from'][start:end].tolist(), self.graph['to'][start:end].tolist(), self.graph['order'][start:end].tolist())
+            for a, b, n in chunk:
+                yield {'from': names[a], 'to': names[b], 'order': n}
@@ -0,0 +1,65 @@
+import sys
+import numpy as np
+
+MODEL_MAGIC = b'NNMODEL1'
+MODEL_HEADER = np.dtype([('magic', 'S8'), ('layers', '<i8'), ('dtype', 'S8'), ('names', '<i8')])
+MODEL_DTYPES = (b'<f4', b'<f8')
+
+def padded(size):
+    return (size + 7) // 8 * 8
+
+def write_model(output_file, names, matrices):
+    dtype = np.dtype(matrices[0].dtype if matrices else np.float64).newbyteorder('<')
+    if dtype.str.encode() not in MODEL_DTYPES:
+        print(f"Ошибка: тип весов {dtype} не поддерживается, ожидался float32 или float64.")
+        sys.exit(1)
+    encoded = [name.encode('utf-8') for name in names]
+    name_offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+    np.cumsum([len(name) for name in encoded], out=name_offsets[1:])
+    blob = b''.join(encoded)
+    shapes = np.array([matrix.shape for matrix in matrices], dtype='<i8').reshape(len(matrices), 2)
+    header = np.array([(MODEL_MAGIC, len(matrices), dtype.str.encode(), len(blob))], dtype=MODEL_HEADER)
+    try:
+        with open(output_file, 'wb') as f:
+            f.write(header.tobytes())
+            f.write(shapes.tobytes())
+            f.write(name_offsets.tobytes())
+            f.write(blob + b'\0' * (padded(len(blob)) - len(blob)))
+            for matrix in matrices:
+                data = np.ascontiguousarray(matrix, dtype=dtype).tobytes()
+                f.write(data + b'\0' * (padded(len(data)) - len(data)))
+    except IOError:
+        print(f"Ошибка: не удалось записать файл '{output_file}'.")
+        sys.exit(1)
+
+def is_binary_model(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MODEL_MAGIC)) == MODEL_MAGIC
+    except FileNotFoundError:
+        print(f"Ошибка: файл '{path}' не найден.")
+        sys.exit(1)
+
+def load_model(path):
+    try:
+        header = np.fromfile(path, dtype=MODEL_HEADER, count=1)[0]
+        layer_count, names_size = int(header['layers']), int(header['names'])
+        if header['dtype'] not in MODEL_DTYPES:
+            raise ValueError(f"неизвестный тип весов {header['dtype']}")
+        dtype = np.dtype(header['dtype'].decode())
+        offset = MODEL_HEADER.itemsize
+        shapes = np.fromfile(path, dtype='<i8', count=2 * layer_count, offset=offset).reshape(layer_count, 2)
+        offset += shapes.nbytes
+        name_offsets = np.fromfile(path, dtype='<i8', count=layer_count + 1, offset=offset)
+        offset += name_offsets.nbytes
+        blob = np.fromfile(path, dtype=np.uint8, count=names_size, offset=offset).tobytes()
+        offset += padded(names_size)
+        matrices = []
+        for rows, columns in shapes.tolist():
+            matrices.append(np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(rows, columns)))
+            offset += padded(rows * columns * dtype.itemsize)
+    except (IndexError, ValueError) as e:
+        print(f"Ошибка: файл '{path}' имеет некорректный формат: {e}")
+        sys.exit(1)
+    names = [blob[name_offsets[i]:name_offsets[i + 1]].decode('utf-8') for i in range(layer_count)]
+    return names, matrices
@@ -1,6 +1,8 @@
 import sys
+import re
 import json
-from collections import OrderedDict, defaultdict
+from array import array
+import graph_binary
 
 def parse_args():
     args = sys.argv[1:]
@@ -8,6 +10,7 @@ def parse_args():
     input_file2 = None
     output_file1 = None
     output_file2 = None
+    output_format = 'indent'
     for arg in args:
         if arg.startswith('input1='):
             input_file1 = arg[7:]
@@ -17,77 +20,164 @@ def parse_args():
             output_file1 = arg[8:]
         elif arg.startswith('output2='):
             output_file2 = arg[8:]
+        elif arg.startswith('format='):
+            output_format = arg[7:]
     if not input_file1:
         input_file1 = 'input.txt'
     if not output_file1:
         output_file1 = 'output.json'
-    return input_file1, input_file2, output_file1, output_file2
+    return input_file1, input_file2, output_file1, output_file2, output_format
 
-def read_input_file(input_file):
+ARC_PATTERN = re.compile(r"\(\s*([^,()]+?)\s*,\s*([^,()]+?)\s*,\s*([^,()]+?)\s*\)")
+SEPARATORS = ' \t\r\n,'
+
+def format_error(line_number, fragment):
+    print(f"Ошибка: неверный формат строки {line_number}: '{fragment.strip()}'")
+    sys.exit(1)
+
+def read_arcs(input_file, chunk_size=1 << 20):
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
-            lines = [line.strip() for line in f.readlines()]
-            return lines
+            buffer = ''
+            line_number = 1
+            while True:
+                chunk = f.read(chunk_size)
+                buffer += chunk
+                position = 0
+                for match in ARC_PATTERN.finditer(buffer):
+                    gap = buffer[position:match.start()]
+                    if gap.strip(SEPARATORS):
+                        format_error(line_number + gap.count('\n', 0, len(gap) - len(gap.lstrip(SEPARATORS))), gap)
+                    line_number += gap.count('\n')
+                    a, b, n = match.groups()
+                    try:
+                        n = int(n)
+                    except ValueError:
+                        format_error(line_number, match.group(0))
+                    yield a, b, n, line_number
+                    line_number += match.group(0).count('\n')
+                    position = match.end()
+                rest = buffer[position:]
+                if ')' in rest or (not chunk and rest.strip(SEPARATORS)):
+                    format_error(line_number + rest.count('\n', 0, len(rest) - len(rest.lstrip(SEPARATORS))), rest)
+                line_number += rest.count('\n', 0, len(rest) - len(rest.lstrip(SEPARATORS)))
+                buffer = rest.lstrip(SEPARATORS)
+                if not chunk:
+                    break
     except FileNotFoundError:
         print(f"Ошибка: файл '{input_file}' не найден.")
         sys.exit(1)
 
-def parse_graph(lines):
+def parse_graph(arcs):
     graph = {
-        'vertices': OrderedDict(), 
-        'arcs': []
+        'vertices': {},
+        'from': array('i'),
+        'to': array('i'),
+        'order': array('q')
     }
+    vertices = graph['vertices']
     seen_arcs = set()
-    incoming_orders = defaultdict(set)
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            arcs_str = line.split('), (')
-            for arc_str in arcs_str:
-                arc_str = arc_str.strip('()')
-                a, b, n = arc_str.split(', ')
-                a = a.strip()
-                b = b.strip()
-                n = int(n.strip())
-                arc_key = (a, b)
-                if arc_key in seen_arcs:
-                    print(f"Ошибка: повторяющаяся дуга ({a}, {b}, {n}) на строке {i+1}.")
-                    sys.exit(1)
-                seen_arcs.add(arc_key)
-                if n in incoming_orders[b]:
-                    print(f"Ошибка: в вершину '{b}' входит несколько дуг с порядком {n} на строке {i+1}.")
-                    sys.exit(1)
-                incoming_orders[b].add(n)
-                if a not in graph['vertices']:
-                    graph['vertices'][a] = True  
-                if b not in graph['vertices']:
-                    graph['vertices'][b] = True
-                graph['arcs'].append({'from': a, 'to': b, 'order': n})
-        except ValueError:
-            print(f"Ошибка: неверный формат строки {i+1}: '{line}'")
+    incoming_orders = set()
+    for a, b, n, line_number in arcs:
+        a_id = vertices.setdefault(sys.intern(a), len(vertices))
+        b_id = vertices.setdefault(sys.intern(b), len(vertices))
+        arc_key = a_id << 32 | b_id
+        if arc_key in seen_arcs:
+            print(f"Ошибка: повторяющаяся дуга ({a}, {b}, {n}) на строке {line_number}.")
+            sys.exit(1)
+        seen_arcs.add(arc_key)
+        if (b_id, n) in incoming_orders:
+            print(f"Ошибка: в вершину '{b}' входит несколько дуг с порядком {n} на строке {line_number}.")
             sys.exit(1)
+        incoming_orders.add((b_id, n))
+        graph['from'].append(a_id)
+        graph['to'].append(b_id)
+        graph['order'].append(n)
     return graph
 
-def write_json(graph, output_file):
-    graph['arcs'] = sorted(graph['arcs'], key=lambda arc: arc['order'])
-    graph_json = {
-        'vertices': list(graph['vertices'].keys()),
-        'arcs': graph['arcs']
-    }
+def sort_arcs_by_order(orders):
+    if not orders:
+        return array('i')
+    low, high = min(orders), max(orders)
+    if high - low > 4 * len(orders) + 1024:
+        return array('i', sorted(range(len(orders)), key=orders.__getitem__))
+    offsets = [0] * (high - low + 2)
+    for order in orders:
+        offsets[order - low + 1] += 1
+    for k in range(1, len(offsets)):
+        offsets[k] += offsets[k - 1]
+    result = array('i', [0]) * len(orders)
+    for i, order in enumerate(orders):
+        result[offsets[order - low]] = i
+        offsets[order - low] += 1
+    return result
+
+def write_joined(f, items, separator, batch_size=4096):
+    batch = []
+    written = False
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            f.write((separator if written else '') + separator.join(batch))
+            written = True
+            batch = []
+    if batch:
+        f.write((separator if written else '') + separator.join(batch))
+        written = True
+    return written
+
+def write_indented(f, names, graph, arcs):
+    f.write('{\n    "vertices": [')
+    if write_joined(f, ('\n        ' + name for name in names), ','):
+        f.write('\n    ')
+    f.write('],\n    "arcs": [')
+    items = ('\n        {\n            "from": %s,\n            "to": %s,\n            "order": %d\n        }'
+             % (names[graph['from'][i]], names[graph['to'][i]], graph['order'][i]) for i in arcs)
+    if write_joined(f, items, ','):
+        f.write('\n    ')
+    f.write(']\n}')
+
+def write_compact(f, names, graph, arcs):
+    f.write('{"vertices":[')
+    write_joined(f, names, ',')
+    f.write('],"arcs":[')
+    items = ('{"from":%s,"to":%s,"order":%d}' % (names[graph['from'][i]], names[graph['to'][i]], graph['order'][i]) for i in arcs)
+    write_joined(f, items, ',')
+    f.write(']}')
+
+def write_lines(f, names, graph, arcs):
+    vertices = ('{"vertex":%s}' % name for name in names)
+    arcs = ('{"from":%s,"to":%s,"order":%d}' % (names[graph['from'][i]], names[graph['to'][i]], graph['order'][i]) for i in arcs)
+    for items in (vertices, arcs):
+        if write_joined(f, items, '\n'):
+            f.write('\n')
+
+WRITERS = {
+    'indent': write_indented,
+    'compact': write_compact,
+    'jsonl': write_lines,
+}
+
+def write_json(graph, output_file, output_format='indent'):
+    if output_format not in WRITERS:
+        print(f"Ошибка: неизвестный формат вывода '{output_format}'. Доступны: {', '.join(WRITERS)}.")
+        sys.exit(1)
+    names = [json.dumps(name, ensure_ascii=False) for name in graph['vertices']]
+    arcs = sort_arcs_by_order(graph['order'])
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(graph_json, f, ensure_ascii=False, indent=4)
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            WRITERS[output_format](f, names, graph, arcs)
     except IOError:
         print(f"Ошибка: не удалось записать файл '{output_file}'.")
         sys.exit(1)
 
 def main():
-    input_file1, input_file2, output_file1, output_file2 = parse_args()
-    lines = read_input_file(input_file1)
-    graph = parse_graph(lines)
-    write_json(graph, output_file1)
+    input_file1, input_file2, output_file1, output_file2, output_format = parse_args()
+    graph = parse_graph(read_arcs(input_file1))
+    if output_format == 'binary':
+        graph_binary.write_graph(output_file1, list(graph['vertices']), graph['from'], graph['to'], graph['order'])
+    else:
+        write_json(graph, output_file1, output_format)
 
 if __name__ == '__main__':
     main()
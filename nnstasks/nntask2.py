@@ -1,96 +1,219 @@
 import sys
+import os
+import io
 import json
-from collections import defaultdict, deque
+import numpy as np
+from collections import deque
+import graph_binary
 
 def parse_args():
     args = sys.argv[1:]
     input_file = None
     output_file = None
+    mode = 'tree'
     for arg in args:
         if arg.startswith('input1='):
             input_file = arg[7:]
         elif arg.startswith('output1='):
             output_file = arg[8:]
+        elif arg.startswith('mode='):
+            mode = arg[5:]
+    if mode not in ('tree', 'memo', 'let'):
+        print(f"Ошибка: неизвестный режим вывода '{mode}'. Доступны: tree, memo, let.")
+        sys.exit(1)
     if not input_file:
         input_file = 'output.json'
     if not output_file:
         output_file = 'output.txt'
-    return input_file, output_file
+    return input_file, output_file, mode
 
 def load_graph(input_file):
+    if graph_binary.is_binary_graph(input_file):
+        graph = graph_binary.load_graph(input_file)
+        return build_index(graph['names'], graph['from'], graph['to'], graph['order'], graph['row_ptr'])
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
             graph = json.load(f)
-            vertices = set(graph['vertices'])
-            arcs = graph['arcs']
-            return vertices, arcs
+        return index_from_arcs(graph['vertices'], graph['arcs'])
     except FileNotFoundError:
         print(f"Ошибка: файл '{input_file}' не найден.")
         sys.exit(1)
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, KeyError, TypeError):
         print(f"Ошибка: файл '{input_file}' имеет некорректный формат.")
         sys.exit(1)
 
-def cycle(vertices, arcs):
-    in_degree = {v: 0 for v in vertices}
-    adjacency_list = defaultdict(list)
-    for arc in arcs:
-        from_vertex, to_vertex = arc['from'], arc['to']
-        adjacency_list[from_vertex].append(to_vertex)
-        in_degree[to_vertex] += 1
-    queue = deque([v for v in vertices if in_degree[v] == 0])
+def index_from_arcs(names, arcs):
+    ids = {name: i for i, name in enumerate(names)}
+    from_ids = np.fromiter((ids[arc['from']] for arc in arcs), dtype=np.int64, count=len(arcs))
+    to_ids = np.fromiter((ids[arc['to']] for arc in arcs), dtype=np.int64, count=len(arcs))
+    orders = np.fromiter((arc['order'] for arc in arcs), dtype=np.int64, count=len(arcs))
+    return build_index(names, from_ids, to_ids, orders)
+
+def csr_pointers(ids, count):
+    pointers = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=count), out=pointers[1:])
+    return pointers
+
+def build_index(names, from_ids, to_ids, orders, in_ptr=None):
+    count = len(names)
+    from_ids = np.asarray(from_ids)
+    to_ids = np.asarray(to_ids)
+    if in_ptr is None:
+        in_sources = from_ids[np.lexsort((np.asarray(orders), to_ids))]
+        in_ptr = csr_pointers(to_ids, count)
+    else:
+        in_sources = from_ids
+    out_targets = to_ids[np.argsort(from_ids, kind='stable')]
+    out_ptr = csr_pointers(from_ids, count)
+    return {
+        'names': names,
+        'in_ptr': in_ptr,
+        'in_sources': in_sources,
+        'out_ptr': out_ptr,
+        'out_targets': out_targets,
+        'in_degree': np.diff(in_ptr),
+        'out_degree': np.diff(out_ptr)
+    }
+
+def cycle(index):
+    in_degree = index['in_degree'].tolist()
+    out_ptr = index['out_ptr'].tolist()
+    out_targets = index['out_targets'].tolist()
+    queue = deque(v for v in range(len(in_degree)) if in_degree[v] == 0)
     sorted_vertices = []
     while queue:
         vertex = queue.popleft()
         sorted_vertices.append(vertex)
-        for neighbor in adjacency_list[vertex]:
+        for neighbor in out_targets[out_ptr[vertex]:out_ptr[vertex + 1]]:
             in_degree[neighbor] -= 1
             if in_degree[neighbor] == 0:
                 queue.append(neighbor)
-    has_cycle = len(sorted_vertices) != len(vertices)
-    return has_cycle, sorted_vertices, adjacency_list
+    has_cycle = len(sorted_vertices) != len(in_degree)
+    return has_cycle, sorted_vertices
 
-def find_root(vertices, arcs):
-    outgoing = {arc['from'] for arc in arcs}
-    incoming = {arc['to'] for arc in arcs}
-    roots = incoming - outgoing
+def find_root(index):
+    roots = np.flatnonzero((index['in_degree'] > 0) & (index['out_degree'] == 0))
     if len(roots) != 1:
         print("Ошибка: граф должен иметь ровно одну корневую вершину.")
         sys.exit(1)
-    return next(iter(roots))
+    return int(roots[0])
+
+def write_subtree(f, index, root, references=None):
+    names = index['names']
+    in_ptr = index['in_ptr'].tolist()
+    in_sources = index['in_sources'].tolist()
+    f.write(f"{names[root]}(")
+    stack = [[root, in_ptr[root]]]
+    while stack:
+        frame = stack[-1]
+        vertex, position = frame
+        if position == in_ptr[vertex + 1]:
+            stack.pop()
+            f.write(')')
+            continue
+        frame[1] = position + 1
+        child = in_sources[position]
+        separator = ', ' if position > in_ptr[vertex] else ''
+        if references is not None and references[child]:
+            f.write(f"{separator}{names[child]}")
+            continue
+        f.write(f"{separator}{names[child]}(")
+        stack.append([child, in_ptr[child]])
+
+def write_memoized(f, index, root, chunk_size=1 << 20):
+    names = [name.encode('utf-8') for name in index['names']]
+    in_ptr = index['in_ptr'].tolist()
+    in_sources = index['in_sources'].tolist()
+    shared = (index['out_degree'] > 1).tolist()
+    spans = {}
+    written = f.write(names[root] + b'(')
+    stack = [[root, in_ptr[root], 0]]
+    while stack:
+        frame = stack[-1]
+        vertex, position, start = frame
+        if position == in_ptr[vertex + 1]:
+            stack.pop()
+            written += f.write(b')')
+            if shared[vertex]:
+                spans[vertex] = (start, written)
+            continue
+        frame[1] = position + 1
+        child = in_sources[position]
+        if position > in_ptr[vertex]:
+            written += f.write(b', ')
+        if child in spans:
+            offset, end = spans[child]
+            while offset < end:
+                f.seek(offset)
+                data = f.read(min(chunk_size, end - offset))
+                f.seek(0, os.SEEK_END)
+                written += f.write(data)
+                offset += len(data)
+            continue
+        stack.append([child, in_ptr[child], written])
+        written += f.write(names[child] + b'(')
+
+def shared_post_order(index, root):
+    in_ptr = index['in_ptr'].tolist()
+    in_sources = index['in_sources'].tolist()
+    shared = (index['out_degree'] > 1) & (index['in_degree'] > 0)
+    visited = np.zeros(len(in_ptr) - 1, dtype=bool)
+    visited[root] = True
+    order = []
+    stack = [[root, in_ptr[root]]]
+    while stack:
+        frame = stack[-1]
+        vertex, position = frame
+        if position == in_ptr[vertex + 1]:
+            stack.pop()
+            if shared[vertex]:
+                order.append(vertex)
+            continue
+        frame[1] = position + 1
+        child = in_sources[position]
+        if not visited[child]:
+            visited[child] = True
+            stack.append([child, in_ptr[child]])
+    return order, shared.tolist()
+
+def write_bindings(f, index, root):
+    order, references = shared_post_order(index, root)
+    for vertex in order:
+        f.write(f"let {index['names'][vertex]} = ")
+        write_subtree(f, index, vertex, references)
+        f.write(";\n")
+    write_subtree(f, index, root, references)
 
-def output(vertices, arcs):
-    adjacency_list = defaultdict(list)
-    for arc in arcs:
-        from_vertex, to_vertex, order = arc['from'], arc['to'], arc['order']
-        adjacency_list[to_vertex].append((from_vertex, order))
-    for vertex in adjacency_list:
-        adjacency_list[vertex].sort(key=lambda x: x[1])
-    def build_subtree(vertex):
-        if vertex not in adjacency_list or not adjacency_list[vertex]:
-            return f"{vertex}()" 
-        children = [build_subtree(child[0]) for child in adjacency_list[vertex]]
-        return f"{vertex}({', '.join(children)})"
-    root = find_root(vertices, arcs)
-    return build_subtree(root)
+def output(index):
+    root = find_root(index)
+    buffer = io.StringIO()
+    write_subtree(buffer, index, root)
+    return buffer.getvalue()
 
-def write_output(output_file, function_representation):
+def write_function(output_file, index, mode='tree'):
+    root = find_root(index)
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(function_representation)
+        if mode == 'memo':
+            with open(output_file, 'w+b', buffering=1 << 20) as f:
+                write_memoized(f, index, root)
+            return
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            if mode == 'let':
+                write_bindings(f, index, root)
+            else:
+                write_subtree(f, index, root)
     except IOError:
         print(f"Ошибка: не удалось записать файл '{output_file}'.")
         sys.exit(1)
 
 def main():
-    input_file, output_file = parse_args()
-    vertices, arcs = load_graph(input_file)
-    has_cycle, _, _ = cycle(vertices, arcs)
+    input_file, output_file, mode = parse_args()
+    index = load_graph(input_file)
+    has_cycle, _ = cycle(index)
     if has_cycle:
         print("Ошибка: граф содержит циклы.")
         sys.exit(1)
-    function_representation = output(vertices, arcs)
-    write_output(output_file, function_representation)
+    write_function(output_file, index, mode)
 
 if __name__ == '__main__':
     main()
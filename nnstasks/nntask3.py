@@ -1,12 +1,21 @@
 import sys
+import os
 import math
+import heapq
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from collections import defaultdict, deque
+import graph_binary
 
 def parse_args():
     args = sys.argv[1:]
     input_file1 = None
     input_file2 = None
     output_file = None
+    gradient_file = None
+    incremental = False
+    engine = 'dfs'
+    workers = None
     for arg in args:
         if arg.startswith('input1='):
             input_file1 = arg[7:]
@@ -14,15 +23,36 @@ def parse_args():
             input_file2 = arg[7:]
         elif arg.startswith('output='):
             output_file = arg[7:]
+        elif arg.startswith('gradient='):
+            gradient_file = arg[9:]
+        elif arg.startswith('incremental='):
+            incremental = arg[12:].lower() in ('1', 'true', 'yes', 'on')
+        elif arg.startswith('engine='):
+            engine = arg[7:]
+        elif arg.startswith('workers='):
+            try:
+                workers = int(arg[8:])
+            except ValueError:
+                print(f"Ошибка: число процессов должно быть целым, получено '{arg[8:]}'.")
+                sys.exit(1)
     if not input_file1:
         input_file1 = 'input.txt'
     if not input_file2:
         input_file2 = 'operations.txt'
     if not output_file:
         output_file = 'output.txt'
-    return input_file1, input_file2, output_file
+    if engine not in ('dfs', 'levels', 'parallel'):
+        print(f"Ошибка: неизвестный режим вычисления '{engine}'. Доступны: dfs, levels, parallel.")
+        sys.exit(1)
+    if workers is not None and workers < 1:
+        print(f"Ошибка: число процессов должно быть положительным: {workers}.")
+        sys.exit(1)
+    return input_file1, input_file2, output_file, gradient_file, incremental, engine, workers
 
 def parse_graph(input_file):
+    if graph_binary.is_binary_graph(input_file):
+        graph = graph_binary.load_graph(input_file)
+        return set(graph['names']), graph_binary.ArcView(graph)
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
             lines = f.read().strip()
@@ -90,59 +120,294 @@ def find_sink(vertices, arcs):
         sys.exit(1)
     return next(iter(sink_candidates))
 
-def evaluate_function(vertices, arcs, operations):
+def build_adjacency(arcs):
     adjacency_list = defaultdict(list)
     for arc in arcs:
         from_vertex, to_vertex, order = arc['from'], arc['to'], arc['order']
         adjacency_list[to_vertex].append((from_vertex, order))
     for vertex in adjacency_list:
         adjacency_list[vertex].sort(key=lambda x: x[1])
+    return adjacency_list
+
+def leaf_value(vertex, operation):
+    if operation is None:
+        print(f"Ошибка: операция для вершины '{vertex}' не найдена.")
+        sys.exit(1)
+    try:
+        return float(operation) if operation.replace('.', '', 1).isdigit() else None
+    except ValueError:
+        print(f"Ошибка: некорректная операция '{operation}' для вершины '{vertex}'.")
+        sys.exit(1)
+
+def apply_operation(vertex, operation, children_values):
+    if None in children_values:
+        print(f"Ошибка: не удалось вычислить значение для вершины '{vertex}'.")
+        sys.exit(1)
+    if operation is None:
+        print(f"Ошибка: операция для вершины '{vertex}' не найдена.")
+        sys.exit(1)
+    try:
+        if operation == '+':
+            return sum(children_values)
+        elif operation == '*':
+            return math.prod(children_values)
+        elif operation == 'exp':
+            if len(children_values) != 1:
+                print(f"Ошибка: операция 'exp' ожидает ровно одно входное значение для вершины '{vertex}'.")
+                sys.exit(1)
+            return math.exp(children_values[0])
+        else:
+            return float(operation)
+    except Exception as e:
+        print(f"Ошибка: некорректная операция '{operation}' для вершины '{vertex}': {e}")
+        sys.exit(1)
+
+def evaluate_function(vertices, arcs, operations, computed_values=None):
+    adjacency_list = build_adjacency(arcs)
+    if computed_values is None:
+        computed_values = {}
+    def evaluate(root):
+        stack = [(root, False)]
+        while stack:
+            vertex, expanded = stack.pop()
+            if vertex in computed_values:
+                continue
+            if vertex not in adjacency_list or not adjacency_list[vertex]:
+                computed_values[vertex] = leaf_value(vertex, operations.get(vertex, None))
+                continue
+            if not expanded:
+                stack.append((vertex, True))
+                for child in reversed(adjacency_list[vertex]):
+                    if child[0] not in computed_values:
+                        stack.append((child[0], False))
+                continue
+            children_values = [computed_values[child[0]] for child in adjacency_list[vertex]]
+            computed_values[vertex] = apply_operation(vertex, operations.get(vertex, None), children_values)
+        return computed_values[root]
+
+    root = find_sink(vertices, arcs)
+    return evaluate(root)
+
+def create_evaluator(vertices, arcs, operations):
     computed_values = {}
-    def evaluate(vertex):
-        if vertex in computed_values:
-            return computed_values[vertex]
-        if vertex not in adjacency_list or not adjacency_list[vertex]:
+    result = evaluate_function(vertices, arcs, operations, computed_values)
+    parents = defaultdict(list)
+    for arc in arcs:
+        parents[arc['from']].append(arc['to'])
+    return {
+        'adjacency': build_adjacency(arcs),
+        'parents': parents,
+        'operations': dict(operations),
+        'values': computed_values,
+        'position': {vertex: i for i, vertex in enumerate(computed_values)},
+        'root': next(reversed(computed_values)),
+        'result': result
+    }
+
+def operations_delta(old_operations, new_operations):
+    changes = {vertex: operation for vertex, operation in new_operations.items() if old_operations.get(vertex) != operation}
+    changes.update((vertex, None) for vertex in old_operations if vertex not in new_operations)
+    return changes
+
+def update_evaluator(evaluator, changes):
+    operations, values, position = evaluator['operations'], evaluator['values'], evaluator['position']
+    adjacency_list, parents = evaluator['adjacency'], evaluator['parents']
+    queue = []
+    for vertex, operation in changes.items():
+        if operation is None:
+            operations.pop(vertex, None)
+        else:
+            operations[vertex] = operation
+        if vertex in position:
+            heapq.heappush(queue, (position[vertex], vertex))
+    queued = {vertex for _, vertex in queue}
+    touched = 0
+    while queue:
+        _, vertex = heapq.heappop(queue)
+        touched += 1
+        children = adjacency_list.get(vertex)
+        if children:
+            value = apply_operation(vertex, operations.get(vertex, None), [values[child[0]] for child in children])
+        else:
+            value = leaf_value(vertex, operations.get(vertex, None))
+        if value == values[vertex]:
+            continue
+        values[vertex] = value
+        for parent in parents.get(vertex, ()):
+            if parent not in queued:
+                queued.add(parent)
+                heapq.heappush(queue, (position[parent], parent))
+    evaluator['result'] = values[evaluator['root']]
+    return evaluator['result'], touched
+
+def post_order(adjacency_list, root):
+    order = []
+    visited = set()
+    stack = [(root, False)]
+    while stack:
+        vertex, expanded = stack.pop()
+        if vertex in visited:
+            continue
+        children = adjacency_list.get(vertex)
+        if children and not expanded:
+            stack.append((vertex, True))
+            for child, _ in reversed(children):
+                if child not in visited:
+                    stack.append((child, False))
+            continue
+        visited.add(vertex)
+        order.append(vertex)
+    return order
+
+def gradient_function(arcs, operations, computed_values):
+    adjacency_list = build_adjacency(arcs)
+    order = post_order(adjacency_list, next(reversed(computed_values)))
+    adjoints = dict.fromkeys(order, 0.0)
+    adjoints[order[-1]] = 1.0
+    for vertex in reversed(order):
+        children = adjacency_list.get(vertex)
+        adjoint = adjoints[vertex]
+        if not children or adjoint == 0.0:
+            continue
+        operation = operations[vertex]
+        if operation == '+':
+            for child, _ in children:
+                adjoints[child] += adjoint
+        elif operation == '*':
+            values = [computed_values[child] for child, _ in children]
+            suffix = [1.0] * (len(values) + 1)
+            for k in range(len(values) - 1, -1, -1):
+                suffix[k] = suffix[k + 1] * values[k]
+            prefix = 1.0
+            for k, (child, _) in enumerate(children):
+                adjoints[child] += adjoint * prefix * suffix[k + 1]
+                prefix *= values[k]
+        elif operation == 'exp':
+            adjoints[children[0][0]] += adjoint * computed_values[vertex]
+    return {vertex: adjoints[vertex] for vertex in order if not adjacency_list.get(vertex)}
+
+def compile_plan(vertices, arcs, sorted_vertices):
+    adjacency_list = defaultdict(list)
+    for arc in arcs:
+        adjacency_list[arc['to']].append((arc['from'], arc['order']))
+    index = {vertex: i for i, vertex in enumerate(sorted_vertices)}
+    steps = []
+    for vertex in sorted_vertices:
+        children = sorted(adjacency_list.get(vertex, []), key=lambda x: x[1])
+        steps.append((vertex, np.array([index[child[0]] for child in children], dtype=np.intp)))
+    return {'steps': steps, 'sink': index[find_sink(vertices, arcs)]}
+
+def plan_error(message, column, count):
+    if count > 1:
+        message += f" (набор операций {column + 1})"
+    print(f"Ошибка: {message}")
+    sys.exit(1)
+
+def evaluate_plan(plan, operation_sets):
+    count = len(operation_sets)
+    values = np.empty((len(plan['steps']), count))
+    valid = np.ones((len(plan['steps']), count), dtype=bool)
+    for i, (vertex, children) in enumerate(plan['steps']):
+        groups = defaultdict(list)
+        for column, operations in enumerate(operation_sets):
             operation = operations.get(vertex, None)
             if operation is None:
-                print(f"Ошибка: операция для вершины '{vertex}' не найдена.")
-                sys.exit(1)
+                plan_error(f"операция для вершины '{vertex}' не найдена.", column, count)
+            groups[operation].append(column)
+        for operation, columns in groups.items():
+            columns = np.array(columns, dtype=np.intp)
+            if len(children) == 0:
+                if operation.replace('.', '', 1).isdigit():
+                    values[i, columns] = float(operation)
+                else:
+                    valid[i, columns] = False
+                continue
+            children_valid = valid[np.ix_(children, columns)].all(axis=0)
+            if not children_valid.all():
+                plan_error(f"не удалось вычислить значение для вершины '{vertex}'.", columns[np.argmin(children_valid)], count)
+            children_values = values[np.ix_(children, columns)]
             try:
-                value = float(operation) if operation.replace('.', '', 1).isdigit() else None
-                computed_values[vertex] = value
-                return value
-            except ValueError:
-                print(f"Ошибка: некорректная операция '{operation}' для вершины '{vertex}'.")
-                sys.exit(1)
+                if operation == '+':
+                    values[i, columns] = children_values.sum(axis=0)
+                elif operation == '*':
+                    values[i, columns] = children_values.prod(axis=0)
+                elif operation == 'exp':
+                    if len(children) != 1:
+                        plan_error(f"операция 'exp' ожидает ровно одно входное значение для вершины '{vertex}'.", columns[0], count)
+                    with np.errstate(over='raise'):
+                        values[i, columns] = np.exp(children_values[0])
+                else:
+                    values[i, columns] = float(operation)
+            except (ValueError, FloatingPointError) as e:
+                plan_error(f"некорректная операция '{operation}' для вершины '{vertex}': {e}", columns[0], count)
+    sink = plan['sink']
+    return [float(values[sink, column]) if valid[sink, column] else None for column in range(count)]
 
-        children_values = [evaluate(child[0]) for child in adjacency_list[vertex]]
-        if None in children_values:
-            print(f"Ошибка: не удалось вычислить значение для вершины '{vertex}'.")
-            sys.exit(1)
+def compile_levels(plan):
+    steps = plan['steps']
+    depth = np.zeros(len(steps), dtype=np.intp)
+    for i, (_, children) in enumerate(steps):
+        if len(children):
+            depth[i] = depth[children].max() + 1
+    levels = [[] for _ in range(int(depth.max()) + 1 if len(steps) else 0)]
+    for i in range(len(steps)):
+        levels[depth[i]].append(i)
+    return levels
 
-        operation = operations.get(vertex, None)
-        if operation is None:
-            print(f"Ошибка: операция для вершины '{vertex}' не найдена.")
-            sys.exit(1)
-        try:
-            if operation == '+':
-                result = sum(children_values)
-            elif operation == '*':
-                result = math.prod(children_values)
-            elif operation == 'exp':
-                if len(children_values) != 1:
-                    print(f"Ошибка: операция 'exp' ожидает ровно одно входное значение для вершины '{vertex}'.")
-                    sys.exit(1)
-                result = math.exp(children_values[0])
-            else:
-                result = float(operation)
-            computed_values[vertex] = result
-            return result
-        except Exception as e:
-            print(f"Ошибка: некорректная операция '{operation}' для вершины '{vertex}': {e}")
-            sys.exit(1)
+def reduce_group(operation, offsets, child_values):
+    if operation == '+':
+        return np.add.reduceat(child_values, offsets)
+    if operation == '*':
+        return np.multiply.reduceat(child_values, offsets)
+    with np.errstate(over='raise'):
+        return np.exp(child_values)
 
-    root = find_sink(vertices, arcs)
-    return evaluate(root)
+def reduce_level(operation, offsets, child_values, executor, workers):
+    if executor is None:
+        return reduce_group(operation, offsets, child_values)
+    bounds = np.linspace(0, len(offsets), workers + 1).astype(np.intp)
+    ends = np.append(offsets, len(child_values))
+    jobs = [(operation, offsets[a:b] - offsets[a], child_values[offsets[a]:ends[b]]) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    return np.concatenate(list(executor.map(reduce_group, *zip(*jobs))))
+
+def evaluate_levels(plan, levels, operations, executor=None, workers=1, threshold=10000, computed_values=None):
+    steps = plan['steps']
+    values = np.zeros(len(steps))
+    valid = np.ones(len(steps), dtype=bool)
+    for level in levels:
+        groups = defaultdict(list)
+        for i in level:
+            vertex, children = steps[i]
+            operation = operations.get(vertex, None)
+            if len(children) == 0:
+                value = leaf_value(vertex, operation)
+                valid[i] = value is not None
+                values[i] = value if value is not None else 0.0
+                continue
+            if not valid[children].all():
+                apply_operation(vertex, operation, [None])
+            if operation in ('+', '*', 'exp'):
+                if operation == 'exp' and len(children) != 1:
+                    apply_operation(vertex, operation, [0.0] * len(children))
+                groups[operation].append(i)
+            else:
+                values[i] = apply_operation(vertex, operation, values[children].tolist())
+        for operation, members in groups.items():
+            children = [steps[i][1] for i in members]
+            offsets = np.zeros(len(children), dtype=np.intp)
+            np.cumsum([len(c) for c in children[:-1]], out=offsets[1:])
+            child_values = values[np.concatenate(children)]
+            pool = executor if len(members) >= threshold else None
+            try:
+                values[members] = reduce_level(operation, offsets, child_values, pool, workers)
+            except FloatingPointError:
+                vertex = steps[members[int(np.argmax(child_values > math.log(np.finfo(np.float64).max)))]][0]
+                apply_operation(vertex, operation, [float('inf')])
+    if computed_values is not None:
+        for i, (vertex, _) in enumerate(steps):
+            computed_values[vertex] = float(values[i]) if valid[i] else None
+    sink = plan['sink']
+    return float(values[sink]) if valid[sink] else None
 
 def write_output(output_file, result):
     try:
@@ -152,16 +417,61 @@ def write_output(output_file, result):
         print(f"Ошибка: не удалось записать файл '{output_file}'.")
         sys.exit(1)
 
+def write_gradient(output_file, gradient):
+    try:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write("{\n")
+            for vertex, value in gradient.items():
+                f.write(f"{vertex}: {value}\n")
+            f.write("}\n")
+    except IOError:
+        print(f"Ошибка: не удалось записать файл '{output_file}'.")
+        sys.exit(1)
+
 def main():
-    input_file1, input_file2, output_file = parse_args()
+    input_file1, input_file2, output_file, gradient_file, incremental, engine, workers = parse_args()
     vertices, arcs = parse_graph(input_file1)
-    operations = load_operations(input_file2)
-    has_cycle, _ = detect_cycles(vertices, arcs)
+    operation_files = input_file2.split(',')
+    has_cycle, sorted_vertices = detect_cycles(vertices, arcs)
     if has_cycle:
         print("Ошибка: граф содержит циклы.")
         sys.exit(1)
-    result = evaluate_function(vertices, arcs, operations)
-    write_output(output_file, result)
+    if gradient_file and len(operation_files) > 1:
+        print("Ошибка: градиент вычисляется только для одного набора операций.")
+        sys.exit(1)
+    if len(operation_files) == 1:
+        operations = load_operations(input_file2)
+        computed_values = {}
+        if engine == 'dfs':
+            result = evaluate_function(vertices, arcs, operations, computed_values)
+        else:
+            plan = compile_plan(vertices, arcs, sorted_vertices)
+            levels = compile_levels(plan)
+            if engine == 'parallel':
+                workers = workers or os.cpu_count()
+                with ProcessPoolExecutor(workers) as executor:
+                    result = evaluate_levels(plan, levels, operations, executor, workers, computed_values=computed_values)
+            else:
+                result = evaluate_levels(plan, levels, operations, computed_values=computed_values)
+        write_output(output_file, result)
+        if gradient_file:
+            write_gradient(gradient_file, gradient_function(arcs, operations, computed_values))
+            print(f"Градиент сохранён в '{gradient_file}'")
+    elif incremental:
+        operations = load_operations(operation_files[0])
+        evaluator = create_evaluator(vertices, arcs, operations)
+        results = [evaluator['result']]
+        for file in operation_files[1:]:
+            new_operations = load_operations(file)
+            result, touched = update_evaluator(evaluator, operations_delta(operations, new_operations))
+            operations = new_operations
+            results.append(result)
+            print(f"'{file}': пересчитано вершин {touched} из {len(evaluator['values'])}")
+        write_output(output_file, "\n".join(map(str, results)))
+    else:
+        plan = compile_plan(vertices, arcs, sorted_vertices)
+        results = evaluate_plan(plan, [load_operations(file) for file in operation_files])
+        write_output(output_file, "\n".join(map(str, results)))
     print(f"Результат сохранён в '{output_file}'")
 
 if __name__ == '__main__':
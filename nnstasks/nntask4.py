@@ -1,6 +1,12 @@
 import numpy as np
 import json
 import sys
+import os
+import re
+import model_binary
+
+MATRIX_ROW = re.compile(r"\[([^\[\]]*)\]")
+DTYPES = {'float32': np.float32, 'float64': np.float64}
 
 def parse_args():
     args = sys.argv[1:]
@@ -8,6 +14,9 @@ def parse_args():
     input_file2 = None
     output_file1 = None
     output_file2 = None
+    batch_size = None
+    use_cache = False
+    dtype = 'float64'
     for arg in args:
         if arg.startswith('input1='):
             input_file1 = arg[7:]
@@ -17,6 +26,16 @@ def parse_args():
             output_file1 = arg[8:]
         elif arg.startswith('output2='):
             output_file2 = arg[8:]
+        elif arg.startswith('batch='):
+            try:
+                batch_size = int(arg[6:])
+            except ValueError:
+                print(f"Ошибка: размер пакета должен быть целым числом, получено '{arg[6:]}'.")
+                sys.exit(1)
+        elif arg.startswith('cache='):
+            use_cache = arg[6:].lower() in ('1', 'true', 'yes', 'on')
+        elif arg.startswith('dtype='):
+            dtype = arg[6:]
     if not input_file1:
         input_file1 = 'input1.txt'
     if not input_file2:
@@ -25,30 +44,116 @@ def parse_args():
         output_file1 = 'output_vector.txt'
     if not output_file2:
         output_file2 = 'neural_network.json'
-    return input_file1, input_file2, output_file1, output_file2
+    return input_file1, input_file2, output_file1, output_file2, batch_size, use_cache, dtype
+
+def parse_dtype(name):
+    if name not in DTYPES:
+        raise ValueError(f"неизвестный тип данных '{name}'. Доступны: {', '.join(DTYPES)}")
+    return DTYPES[name]
+
+def sigmoid(z):
+    result = np.empty_like(z)
+    positive = z >= 0
+    result[positive] = 1 / (1 + np.exp(-z[positive]))
+    exp_z = np.exp(z[~positive])
+    result[~positive] = exp_z / (1 + exp_z)
+    return result
+
+def parse_matrix(text, dtype=np.float64):
+    rows = MATRIX_ROW.findall(text)
+    if not rows or not text.startswith('[') or not text.endswith(']'):
+        raise ValueError(f"ожидалась матрица вида [[...], ...], получено '{text[:40]}'")
+    columns = rows[0].count(',') + 1
+    matrix = np.empty((len(rows), columns), dtype=dtype)
+    for i, row in enumerate(rows):
+        values = row.split(',')
+        if len(values) != columns:
+            raise ValueError(f"строка {i+1} содержит {len(values)} элементов вместо {columns}")
+        matrix[i] = [float(value) for value in values]
+    return matrix
+
+def matrices_cache_path(file_path):
+    return file_path + '.npz'
 
-def read_matrices(file_path):
+def load_matrices_cache(file_path, dtype=np.float64):
+    cache_path = matrices_cache_path(file_path)
+    try:
+        stat = os.stat(file_path)
+        with np.load(cache_path) as cache:
+            if int(cache['source_mtime']) != stat.st_mtime_ns or int(cache['source_size']) != stat.st_size:
+                return None
+            matrices = [cache[f'layer_{i}'] for i in range(int(cache['layers']))]
+            if any(matrix.dtype != dtype for matrix in matrices):
+                return None
+            return matrices
+    except (OSError, KeyError, ValueError):
+        return None
+
+def save_matrices_cache(file_path, matrices):
+    cache_path = matrices_cache_path(file_path)
+    stat = os.stat(file_path)
+    arrays = {f'layer_{i}': matrix for i, matrix in enumerate(matrices)}
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as file:
+            np.savez(file, layers=len(matrices), source_mtime=stat.st_mtime_ns, source_size=stat.st_size, **arrays)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def read_matrices(file_path, use_cache=False, dtype=np.float64):
+    if model_binary.is_binary_model(file_path):
+        _, matrices = model_binary.load_model(file_path)
+        return [matrix if matrix.dtype == dtype else matrix.astype(dtype) for matrix in matrices]
+    if use_cache:
+        matrices = load_matrices_cache(file_path, dtype)
+        if matrices is not None:
+            return matrices
     matrices = []
     try:
         with open(file_path, 'r') as file:
-            data = file.read().split("\n")
-            for line in data:
-                if line.strip():
-                    matrix = eval(line.split(":")[1].strip())
-                    matrices.append(np.array(matrix))
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                if ':' not in line:
+                    raise ValueError(f"строка {line_number}: отсутствует имя матрицы")
+                try:
+                    matrices.append(parse_matrix(line.split(":", 1)[1].strip(), dtype))
+                except ValueError as e:
+                    raise ValueError(f"строка {line_number}: {e}")
     except Exception as e:
         raise ValueError(f"Ошибка при чтении матриц: {e}")
+    if use_cache:
+        save_matrices_cache(file_path, matrices)
     return matrices
 
-def read_input_vector(file_path):
+def read_input_vector(file_path, dtype=np.float64):
     try:
         with open(file_path, 'r') as file:
             data = file.read().strip()
-            vector = np.array([float(x) for x in data.split(",")])
+            vector = np.array([float(x) for x in data.split(",")], dtype=dtype)
     except Exception as e:
         raise ValueError(f"Ошибка при чтении входного вектора: {e}")
     return vector
 
+def read_input_vectors(file_path, batch_size, dtype=np.float64):
+    try:
+        with open(file_path, 'r') as file:
+            rows = []
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                rows.append([float(x) for x in line.split(",")])
+                if len(rows) == batch_size:
+                    yield np.array(rows, dtype=dtype)
+                    rows = []
+            if rows:
+                yield np.array(rows, dtype=dtype)
+    except Exception as e:
+        raise ValueError(f"Ошибка при чтении входных векторов: {e}")
+
 def network(matrices, input_vector):
     activations = [input_vector]
     for i, matrix in enumerate(matrices):
@@ -57,10 +162,34 @@ def network(matrices, input_vector):
                 f"Несоответствие размеров: матрица {i+1} ожидает вход {matrix.shape[1]}, а получила {activations[-1].shape[0]}"
             )
         z = np.dot(matrix, activations[-1])
-        a = 1 / (1 + np.exp(-z))  
+        a = sigmoid(z)
         activations.append(a)
     return activations
 
+def network_batch(matrices, input_vectors):
+    outputs = input_vectors
+    for i, matrix in enumerate(matrices):
+        if outputs.shape[1] != matrix.shape[1]:
+            raise ValueError(
+                f"Несоответствие размеров: матрица {i+1} ожидает вход {matrix.shape[1]}, а получила {outputs.shape[1]}"
+            )
+        z = outputs @ matrix.T
+        outputs = sigmoid(z)
+    return outputs
+
+def run_batches(matrices, input_file, output_file, batch_size):
+    count = 0
+    dtype = matrices[0].dtype if matrices else np.float64
+    try:
+        with open(output_file, 'w') as file:
+            for input_vectors in read_input_vectors(input_file, batch_size, dtype):
+                outputs = network_batch(matrices, input_vectors)
+                file.write("".join(", ".join(map(str, vector)) + "\n" for vector in outputs))
+                count += len(outputs)
+    except OSError as e:
+        raise ValueError(f"Ошибка при записи выходных векторов: {e}")
+    return count
+
 def serialize_to_json(matrices, output_file):
     net_data = {"NeuralNetwork": []}
     for i, matrix in enumerate(matrices):
@@ -83,14 +212,22 @@ def write_output_vector(vector, output_file):
         raise ValueError(f"Ошибка при записи выходного вектора: {e}")
 
 if __name__ == "__main__":
-    weight_file, input_file, output_vector_file, output_json = parse_args()
+    weight_file, input_file, output_vector_file, output_json, batch_size, use_cache, dtype_name = parse_args()
     try:
-        matrices = read_matrices(weight_file)
-        input_vector = read_input_vector(input_file)
-        activations = network(matrices, input_vector)
-        serialize_to_json(matrices, output_json)
-        write_output_vector(activations[-1], output_vector_file)
-        print(f"Результаты сохранены в файлы: {output_json}, {output_vector_file}")
+        dtype = parse_dtype(dtype_name)
+        matrices = read_matrices(weight_file, use_cache, dtype)
+        if batch_size is not None:
+            if batch_size < 1:
+                raise ValueError(f"размер пакета должен быть положительным: {batch_size}")
+            count = run_batches(matrices, input_file, output_vector_file, batch_size)
+            serialize_to_json(matrices, output_json)
+            print(f"Обработано векторов: {count}. Результаты сохранены в файлы: {output_json}, {output_vector_file}")
+        else:
+            input_vector = read_input_vector(input_file, dtype)
+            activations = network(matrices, input_vector)
+            serialize_to_json(matrices, output_json)
+            write_output_vector(activations[-1], output_vector_file)
+            print(f"Результаты сохранены в файлы: {output_json}, {output_vector_file}")
 
     except ValueError as e:
         print(f"Ошибка: {e}")
\ No newline at end of file
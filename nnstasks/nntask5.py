@@ -1,11 +1,48 @@
 import argparse
 import sys
+import csv
+import gc
+import json
 import numpy as np
 import re
+import os
+import time
+import shutil
+import tempfile
+import threading
+import tracemalloc
+import multiprocessing
+import multiprocessing.connection
+from multiprocessing import shared_memory
+import math
+import model_binary
 from math import exp
 
+DATASET_MAGIC = b'NNDATA01'
+DATASET_HEADER = np.dtype([('magic', 'S8'), ('rows', '<i8'), ('x_cols', '<i8'), ('y_cols', '<i8')])
+RUN, STOP = 1, 0
+WORKER_TIMEOUT = 300
+TEXT_PARAMETERS = {'optimizer', 'schedule'}
+PROFILE_PHASES = ('load', 'forward', 'backward', 'update', 'workers', 'validate')
+METRICS_FORMATS = ('jsonl', 'csv')
+REPORTS = ('summary', 'samples', 'none')
+DATASET_TOKEN = re.compile(r"(?P<name>[^\s:\[\],]+)\s*:|\[(?P<row>[^\[\]]*)\]")
+
+DTYPES = {'float32': np.float32, 'float64': np.float64}
+
 def sigmoid(x):
-    return 1 / (1 + exp(-x))
+    if x >= 0:
+        return 1 / (1 + exp(-x))
+    z = exp(x)
+    return z / (1 + z)
+
+def sigmoid_array(z):
+    result = np.empty_like(z)
+    positive = z >= 0
+    result[positive] = 1 / (1 + np.exp(-z[positive]))
+    exp_z = np.exp(z[~positive])
+    result[~positive] = exp_z / (1 + exp_z)
+    return result
 
 def forward_pass(layers, inputs):
     for idx, layer in enumerate(layers):
@@ -18,7 +55,7 @@ def forward_pass(layers, inputs):
 
 def backward_pass(layers, expected):
     total_error = 0
-    deltas = [np.zeros(layer['neurons']) for layer in layers]
+    deltas = [np.zeros(layer['neurons'], dtype=layer['weights'].dtype) for layer in layers]
     last_layer = layers[-1]
     for i in range(len(expected)):
         error = last_layer['outputs'][i] - expected[i]
@@ -36,21 +73,336 @@ def update_weights(layers, deltas, learning_rate):
             for j in range(layer['inputs_count']):
                 layer['weights'][i][j] -= learning_rate * delta[i] * layer['inputs'][j]
 
-def train(layers, inputs, outputs, max_epochs, learning_rate, error_threshold):
-    history = []
-    for epoch in range(max_epochs):
+def make_profiler(path, metrics_format):
+    columns = ['epoch', 'error', 'validation_error', 'seconds', 'samples_per_second'] + [f'{phase}_seconds' for phase in PROFILE_PHASES] + ['allocated_blocks', 'gc_collections', 'peak_bytes']
+    file = open(path, 'w', newline='')
+    writer = None
+    if metrics_format == 'csv':
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+    return {'path': path, 'file': file, 'writer': writer, 'phases': dict.fromkeys(PROFILE_PHASES, 0.0), 'start': 0.0, 'blocks': 0, 'collections': 0}
+
+def profiled(profile, phase, func):
+    if profile is None:
+        return func
+    phases = profile['phases']
+    def wrapper(*args):
+        start = time.perf_counter()
+        result = func(*args)
+        phases[phase] += time.perf_counter() - start
+        return result
+    return wrapper
+
+def gc_collections():
+    return sum(generation['collections'] for generation in gc.get_stats())
+
+def start_epoch_profile(profile):
+    profile['phases'].update(dict.fromkeys(PROFILE_PHASES, 0.0))
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    profile.update(blocks=sys.getallocatedblocks(), collections=gc_collections(), start=time.perf_counter())
+
+def finish_epoch_profile(profile, epoch, mean_error, validation_error, sample_count):
+    elapsed = time.perf_counter() - profile['start']
+    row = {'epoch': epoch, 'error': mean_error, 'validation_error': validation_error, 'seconds': elapsed, 'samples_per_second': sample_count / elapsed if elapsed else 0.0}
+    row.update((f'{phase}_seconds', seconds) for phase, seconds in profile['phases'].items())
+    row.update(allocated_blocks=sys.getallocatedblocks() - profile['blocks'], gc_collections=gc_collections() - profile['collections'], peak_bytes=tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None)
+    if profile['writer']:
+        profile['writer'].writerow(row)
+    else:
+        profile['file'].write(json.dumps(row) + '\n')
+    profile['file'].flush()
+
+def close_profiler(profile):
+    if profile is not None:
+        profile['file'].close()
+
+def predict_batch(layers, inputs, chunk_size=1024):
+    dtype = layers[0]['weights'].dtype
+    for start in range(0, len(inputs), chunk_size):
+        activations = np.asarray(inputs[start:start + chunk_size], dtype=dtype)
+        for layer in layers:
+            activations = sigmoid_array(activations @ layer['weights'].T)
+        yield start, activations
+
+def evaluate_batch(layers, inputs, outputs, chunk_size=1024):
+    total_error = 0.0
+    for start, results in predict_batch(layers, inputs, chunk_size):
+        errors = results - np.asarray(outputs[start:start + len(results)], dtype=results.dtype)
+        total_error += float(np.sum(errors ** 2)) / 2
+    return total_error / len(inputs)
+
+def make_early_stopping(inputs, outputs, error_threshold, patience=0, min_delta=0.0, state=None):
+    state = {} if state is None else state
+    state.update(best=math.inf, waited=0, error=None)
+    def validate(layers):
+        validation_error = evaluate_batch(layers, inputs, outputs)
+        state['error'] = validation_error
+        if validation_error < state['best'] - min_delta:
+            state.update(best=validation_error, waited=0)
+        else:
+            state['waited'] += 1
+        if patience and state['waited'] >= patience:
+            print(f"Ранняя остановка: ошибка на проверочной выборке не уменьшалась {patience} эпох (лучшая {state['best']})")
+            return validation_error, True
+        return validation_error, validation_error <= error_threshold
+    return validate
+
+def run_epochs(layers, run_epoch, sample_count, max_epochs, error_threshold, checkpoint=None, history=None, profile=None, validation=None):
+    history = [] if history is None else history
+    validate = profiled(profile, 'validate', validation) if validation else None
+    stop = bool(history) and not validation and history[-1] <= error_threshold
+    for epoch in range(len(history), max_epochs):
+        if stop:
+            break
+        if profile:
+            start_epoch_profile(profile)
+        mean_error = float(run_epoch(epoch)) / sample_count
+        history.append(mean_error)
+        if validate:
+            validation_error, stop = validate(layers)
+        else:
+            validation_error, stop = None, mean_error <= error_threshold
+        if profile:
+            finish_epoch_profile(profile, epoch + 1, mean_error, validation_error, sample_count)
+        if checkpoint:
+            checkpoint(layers, history)
+    if checkpoint:
+        checkpoint(layers, history, final=True)
+    return history
+
+def train(layers, inputs, outputs, max_epochs, learning_rate, error_threshold, checkpoint=None, history=None, schedule=None, profile=None, validation=None):
+    forward = profiled(profile, 'forward', forward_pass)
+    backward = profiled(profile, 'backward', backward_pass)
+    update = profiled(profile, 'update', update_weights)
+    def run_epoch(epoch):
+        rate = schedule(epoch) if schedule else learning_rate
         total_error = 0
         for x, y in zip(inputs, outputs):
-            forward_pass(layers, x)
-            error, deltas = backward_pass(layers, y)
+            forward(layers, x)
+            error, deltas = backward(layers, y)
             total_error += error
-            update_weights(layers, deltas, learning_rate)
-        mean_error = total_error / len(inputs)
-        history.append(mean_error)
-        if mean_error <= error_threshold:
-            break
-    for i in range(len(inputs)):
-        print(f'Вход: {inputs[i]}, Ожидаемое значение: {outputs[i]}, Выход: {forward_pass(layers, inputs[i])}')
+            update(layers, deltas, rate)
+        return total_error
+    return run_epochs(layers, run_epoch, len(inputs), max_epochs, error_threshold, checkpoint, history, profile, validation)
+
+def forward_batch(layers, inputs):
+    for idx, layer in enumerate(layers):
+        layer['inputs'] = np.asarray(inputs, dtype=layer['weights'].dtype) if idx == 0 else layers[idx - 1]['outputs']
+        layer['outputs'] = sigmoid_array(layer['inputs'] @ layer['weights'].T)
+        layer['derivatives'] = layer['outputs'] * (1 - layer['outputs'])
+    return layers[-1]['outputs']
+
+def backward_batch(layers, expected):
+    deltas = [None] * len(layers)
+    errors = layers[-1]['outputs'] - np.asarray(expected, dtype=layers[-1]['outputs'].dtype)
+    deltas[-1] = errors * layers[-1]['derivatives']
+    total_error = float(np.sum(errors ** 2)) / 2
+    for idx in range(len(layers) - 1, 0, -1):
+        deltas[idx - 1] = (deltas[idx] @ layers[idx]['weights']) * layers[idx - 1]['derivatives']
+    return total_error, deltas
+
+def update_weights_batch(layers, gradients, learning_rate):
+    for layer, gradient in zip(layers, gradients):
+        layer['weights'] -= learning_rate * gradient
+
+def batch_gradients(layers, deltas):
+    return [(delta.T @ layer['inputs']) / delta.shape[0] for layer, delta in zip(layers, deltas)]
+
+def make_optimizer_state(layers, name='sgd'):
+    moments = name != 'sgd'
+    return {'name': name, 'step': 0, 'first': [np.zeros_like(layer['weights']) for layer in layers if moments], 'second': [np.zeros_like(layer['weights']) for layer in layers if moments]}
+
+def make_optimizer(params, layers, state=None):
+    name = params.get('optimizer', 'sgd')
+    if name == 'sgd':
+        return update_weights_batch
+    momentum = params.get('momentum', 0.9)
+    beta1, beta2 = params.get('beta1', 0.9), params.get('beta2', 0.999)
+    rho, epsilon = params.get('rho', 0.9), params.get('epsilon', 1e-8)
+    state = state or make_optimizer_state(layers, name)
+    first, second = state['first'], state['second']
+    def momentum_update(layers, gradients, learning_rate):
+        for layer, gradient, velocity in zip(layers, gradients, first):
+            velocity *= momentum
+            velocity -= learning_rate * gradient
+            layer['weights'] += velocity
+    def nesterov_update(layers, gradients, learning_rate):
+        for layer, gradient, velocity in zip(layers, gradients, first):
+            layer['weights'] -= momentum * velocity
+            velocity *= momentum
+            velocity -= learning_rate * gradient
+            layer['weights'] += (1 + momentum) * velocity
+    def rmsprop_update(layers, gradients, learning_rate):
+        for layer, gradient, square in zip(layers, gradients, second):
+            square *= rho
+            square += (1 - rho) * gradient ** 2
+            layer['weights'] -= learning_rate * gradient / (np.sqrt(square) + epsilon)
+    def adam_update(layers, gradients, learning_rate):
+        state['step'] += 1
+        rate = learning_rate * np.sqrt(1 - beta2 ** state['step']) / (1 - beta1 ** state['step'])
+        for layer, gradient, mean, square in zip(layers, gradients, first, second):
+            mean *= beta1
+            mean += (1 - beta1) * gradient
+            square *= beta2
+            square += (1 - beta2) * gradient ** 2
+            layer['weights'] -= rate * mean / (np.sqrt(square) + epsilon)
+    optimizers = {'momentum': momentum_update, 'nesterov': nesterov_update, 'rmsprop': rmsprop_update, 'adam': adam_update}
+    if name not in optimizers:
+        raise ValueError(f"неизвестный оптимизатор '{name}'. Доступны: sgd, {', '.join(optimizers)}")
+    return optimizers[name]
+
+def make_schedule(params, max_epochs):
+    name = params.get('schedule', 'constant')
+    alpha = params['alpha']
+    gamma = params.get('gamma', 0.5)
+    step_size = params.get('step_size', 10)
+    decay = params.get('decay', 0.01)
+    schedules = {
+        'constant': lambda epoch: alpha,
+        'step': lambda epoch: alpha * gamma ** (epoch // step_size),
+        'exponential': lambda epoch: alpha * gamma ** epoch,
+        'inverse': lambda epoch: alpha / (1 + decay * epoch),
+        'cosine': lambda epoch: alpha * 0.5 * (1 + math.cos(math.pi * epoch / max_epochs)),
+    }
+    if name not in schedules:
+        raise ValueError(f"неизвестное расписание скорости обучения '{name}'. Доступны: {', '.join(schedules)}")
+    return schedules[name]
+
+def load_batch(inputs, outputs, start, end):
+    x, y = inputs[start:end], outputs[start:end]
+    if isinstance(inputs, np.memmap):
+        x, y = np.array(x), np.array(y)
+    return x, y
+
+def backward_gradients(layers, expected):
+    error, deltas = backward_batch(layers, expected)
+    return error, batch_gradients(layers, deltas)
+
+def train_batched(layers, inputs, outputs, max_epochs, learning_rate, error_threshold, batch_size, checkpoint=None, history=None, schedule=None, optimizer=None, profile=None, validation=None):
+    load = profiled(profile, 'load', load_batch)
+    forward = profiled(profile, 'forward', forward_batch)
+    backward = profiled(profile, 'backward', backward_gradients)
+    update = profiled(profile, 'update', optimizer or update_weights_batch)
+    def run_epoch(epoch):
+        rate = schedule(epoch) if schedule else learning_rate
+        total_error = 0
+        for start in range(0, len(inputs), batch_size):
+            x, y = load(inputs, outputs, start, start + batch_size)
+            forward(layers, x)
+            error, gradients = backward(layers, y)
+            total_error += error
+            update(layers, gradients, rate)
+        return total_error
+    return run_epochs(layers, run_epoch, len(inputs), max_epochs, error_threshold, checkpoint, history, profile, validation)
+
+def print_results(layers, inputs, outputs):
+    for start, results in predict_batch(layers, inputs):
+        for i in range(len(results)):
+            print(f'Вход: {inputs[start + i]}, Ожидаемое значение: {outputs[start + i]}, Выход: {results[i]}')
+
+def print_summary(history, validation_error, validation_count):
+    print(f"Эпох: {len(history)}, ошибка на обучающей выборке за последнюю эпоху: {history[-1] if history else '-'}")
+    if validation_error is not None:
+        print(f"Ошибка на проверочной выборке ({validation_count} примеров): {validation_error}")
+
+def shared_array(segments, shape, dtype):
+    dtype = np.dtype(dtype)
+    memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+    segments.append(memory)
+    return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+def parallel_worker(rank, workers, layers, inputs, outputs, gradients, errors, control, barrier):
+    try:
+        while True:
+            barrier.wait()
+            command, start, end = control.tolist()
+            if command == STOP:
+                break
+            chunk = -(-(end - start) // workers)
+            low, high = start + rank * chunk, min(end, start + (rank + 1) * chunk)
+            if low >= high:
+                for gradient in gradients:
+                    gradient[rank] = 0
+                errors[rank] = 0
+            else:
+                forward_batch(layers, inputs[low:high])
+                error, deltas = backward_batch(layers, outputs[low:high])
+                for layer, delta, gradient in zip(layers, deltas, gradients):
+                    np.matmul(delta.T, layer['inputs'], out=gradient[rank])
+                errors[rank] = error
+            barrier.wait()
+    except threading.BrokenBarrierError:
+        return
+    except Exception:
+        barrier.abort()
+        raise
+
+def watch_workers(processes, barrier, stopping):
+    sentinels = [process.sentinel for process in processes]
+    while not stopping.is_set():
+        if multiprocessing.connection.wait(sentinels, timeout=0.5):
+            if not stopping.is_set():
+                barrier.abort()
+            return
+
+def train_parallel(layers, inputs, outputs, max_epochs, learning_rate, error_threshold, batch_size, workers, checkpoint=None, history=None, schedule=None, optimizer=None, profile=None, validation=None, timeout=WORKER_TIMEOUT):
+    update = profiled(profile, 'update', optimizer or update_weights_batch)
+    context = multiprocessing.get_context('fork')
+    segments = []
+    processes = []
+    stopping = threading.Event()
+    try:
+        for layer in layers:
+            weights = shared_array(segments, layer['weights'].shape, layer['weights'].dtype)
+            weights[...] = layer['weights']
+            layer['weights'] = weights
+        gradients = [shared_array(segments, (workers,) + layer['weights'].shape, layer['weights'].dtype) for layer in layers]
+        errors = shared_array(segments, (workers,), np.float64)
+        control = shared_array(segments, (3,), np.int64)
+        barrier = context.Barrier(workers + 1)
+        for rank in range(workers):
+            worker_layers = [dict(layer) for layer in layers]
+            process = context.Process(target=parallel_worker, args=(rank, workers, worker_layers, inputs, outputs, gradients, errors, control, barrier), daemon=True)
+            process.start()
+            processes.append(process)
+        threading.Thread(target=watch_workers, args=(processes, barrier, stopping), daemon=True).start()
+        def run_workers(start, end):
+            control[:] = (RUN, start, end)
+            barrier.wait()
+            barrier.wait(timeout)
+        compute = profiled(profile, 'workers', run_workers)
+        def run_epoch(epoch):
+            rate = schedule(epoch) if schedule else learning_rate
+            total_error = 0
+            for start in range(0, len(inputs), batch_size):
+                end = min(start + batch_size, len(inputs))
+                compute(start, end)
+                total_error += float(errors.sum())
+                update(layers, [gradient.sum(axis=0) / (end - start) for gradient in gradients], rate)
+            return total_error
+        try:
+            history = run_epochs(layers, run_epoch, len(inputs), max_epochs, error_threshold, checkpoint, history, profile, validation)
+            stopping.set()
+            control[0] = STOP
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            for process in processes:
+                process.join(timeout=1)
+            if any(process.exitcode for process in processes):
+                raise RuntimeError("один из процессов обучения завершился с ошибкой")
+            raise RuntimeError(f"процессы обучения не ответили за {timeout} с")
+    finally:
+        stopping.set()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        for layer in layers:
+            layer['weights'] = np.array(layer['weights'])
+        for memory in segments:
+            memory.close()
+            memory.unlink()
     return history
 
 def load_matrix_file(filename):
@@ -76,6 +428,142 @@ def load_matrix_file(filename):
          sys.exit(1)
     return matrices
 
+def is_binary_dataset(filename):
+    try:
+        with open(filename, 'rb') as file:
+            return file.read(len(DATASET_MAGIC)) == DATASET_MAGIC
+    except FileNotFoundError:
+        print(f"Ошибка, файл не найден: {filename}")
+        sys.exit(1)
+
+def load_binary_dataset(filename):
+    try:
+        header = np.fromfile(filename, dtype=DATASET_HEADER, count=1)[0]
+        if header['magic'] != DATASET_MAGIC:
+            print(f"Ошибка, файл '{filename}' не является бинарным набором данных.")
+            sys.exit(1)
+        rows, x_cols, y_cols = int(header['rows']), int(header['x_cols']), int(header['y_cols'])
+        offset = DATASET_HEADER.itemsize
+        inputs = np.memmap(filename, dtype='<f8', mode='r', offset=offset, shape=(rows, x_cols))
+        outputs = np.memmap(filename, dtype='<f8', mode='r', offset=offset + inputs.nbytes, shape=(rows, y_cols))
+    except (IndexError, ValueError) as e:
+        print(f"Ошибка, повреждённый бинарный набор данных '{filename}': {e}")
+        sys.exit(1)
+    return inputs, outputs
+
+def convert_dataset(text_file, binary_file, chunk_size=1 << 20):
+    directory = os.path.dirname(os.path.abspath(binary_file))
+    parts = {}
+    name = None
+    try:
+        with open(text_file, 'r') as source:
+            buffer = ''
+            while True:
+                chunk = source.read(chunk_size)
+                buffer += chunk
+                end = 0
+                for match in DATASET_TOKEN.finditer(buffer):
+                    end = match.end()
+                    if match.group('name') is not None:
+                        name = match.group('name')
+                        if name in ('x', 'y'):
+                            parts[name] = {'file': tempfile.TemporaryFile(dir=directory), 'rows': 0, 'cols': None}
+                        continue
+                    if name not in parts:
+                        continue
+                    part = parts[name]
+                    row = np.array([float(v) for v in match.group('row').split(',') if v.strip()], dtype='<f8')
+                    if part['cols'] is None:
+                        part['cols'] = len(row)
+                    elif part['cols'] != len(row):
+                        print(f"Ошибка, строки матрицы {name} имеют разную длину в файле '{text_file}'.")
+                        sys.exit(1)
+                    part['file'].write(row.tobytes())
+                    part['rows'] += 1
+                buffer = buffer[end:]
+                if not chunk:
+                    break
+        if 'x' not in parts or 'y' not in parts:
+            print(f"Ошибка, в файле '{text_file}' должны быть матрицы x и y.")
+            sys.exit(1)
+        if parts['x']['rows'] != parts['y']['rows']:
+            print("Размерность x и y не совпадает.")
+            sys.exit(1)
+        header = np.array([(DATASET_MAGIC, parts['x']['rows'], parts['x']['cols'], parts['y']['cols'])], dtype=DATASET_HEADER)
+        with open(binary_file, 'wb') as target:
+            target.write(header.tobytes())
+            for key in ('x', 'y'):
+                parts[key]['file'].seek(0)
+                shutil.copyfileobj(parts[key]['file'], target)
+    except FileNotFoundError:
+        print(f"Ошибка, файл не найден: {text_file}")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Ошибка при преобразовании набора данных '{text_file}': {e}")
+        sys.exit(1)
+    finally:
+        for part in parts.values():
+            part['file'].close()
+
+def make_checkpointer(path, every_epochs=0, every_seconds=0, optimizer_state=None):
+    state = {'epoch': 0, 'time': time.monotonic(), 'thread': None}
+    def write(arrays):
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Не удалось записать контрольную точку '{path}': {e}")
+    def checkpoint(layers, history, final=False):
+        epoch = len(history)
+        due = (every_epochs and epoch - state['epoch'] >= every_epochs) or (every_seconds and time.monotonic() - state['time'] >= every_seconds)
+        if not (due or final):
+            return
+        if state['thread'] is not None:
+            state['thread'].join()
+        arrays = {f'layer_{i}': layer['weights'].copy() for i, layer in enumerate(layers)}
+        arrays.update(layers=len(layers), epoch=epoch, history=np.array(history, dtype=np.float64))
+        if optimizer_state:
+            arrays.update(optimizer=optimizer_state['name'], optimizer_step=optimizer_state['step'])
+            arrays.update((f'first_{i}', moment.copy()) for i, moment in enumerate(optimizer_state['first']))
+            arrays.update((f'second_{i}', moment.copy()) for i, moment in enumerate(optimizer_state['second']))
+        state.update(epoch=epoch, time=time.monotonic())
+        if final:
+            state['thread'] = None
+            write(arrays)
+        else:
+            state['thread'] = threading.Thread(target=write, args=(arrays,))
+            state['thread'].start()
+    return checkpoint
+
+def load_checkpoint(path, layers, optimizer_state=None):
+    try:
+        with np.load(path) as checkpoint:
+            if int(checkpoint['layers']) != len(layers):
+                raise ValueError(f"в контрольной точке {int(checkpoint['layers'])} слоёв, в сети {len(layers)}")
+            for i, layer in enumerate(layers):
+                weights = checkpoint[f'layer_{i}']
+                if weights.shape != layer['weights'].shape:
+                    raise ValueError(f"слой {i + 1} имеет размер {weights.shape} вместо {layer['weights'].shape}")
+                layer['weights'][...] = weights
+            if optimizer_state:
+                saved = str(checkpoint['optimizer']) if 'optimizer' in checkpoint else 'sgd'
+                if saved != optimizer_state['name']:
+                    raise ValueError(f"контрольная точка сохранена с оптимизатором '{saved}', а задан '{optimizer_state['name']}'")
+            if optimizer_state and optimizer_state['name'] != 'sgd':
+                for i, (first, second) in enumerate(zip(optimizer_state['first'], optimizer_state['second'])):
+                    first[...] = checkpoint[f'first_{i}']
+                    second[...] = checkpoint[f'second_{i}']
+                optimizer_state['step'] = int(checkpoint['optimizer_step'])
+            return checkpoint['history'].tolist()
+    except FileNotFoundError:
+        print(f"Ошибка, файл не найден: {path}")
+        sys.exit(1)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Не удалось загрузить контрольную точку '{path}': {e}")
+        sys.exit(1)
+
 def load_parameters_file(filename):
     try:
         with open(filename, 'r') as file:
@@ -85,8 +573,11 @@ def load_parameters_file(filename):
                     key, value = line.split('=', 1)
                     key = key.strip()
                     value = value.strip()
+                    if key in TEXT_PARAMETERS:
+                        params[key] = value
+                        continue
                     try:
-                        params[key] = float(value) if '.' in value else int(value)
+                        params[key] = float(value) if any(c in value for c in '.eE') else int(value)
                     except ValueError:
                          print(f"Ошибка, неверный формат параметра в файле '{filename}'. Параметр '{key}' имеет значение '{value}'")
                          sys.exit(1)
@@ -114,6 +605,13 @@ def main():
     args = parse_arguments()
     if not args:
       sys.exit(1)
+    if 'convert' in args:
+        if 'output1' not in args:
+            print("Error: Missing parameters. Please provide convert and output1.")
+            sys.exit(1)
+        convert_dataset(args['convert'], args['output1'])
+        print(f"Набор данных сохранен в файл {args['output1']}")
+        return
     if not all(key in args for key in ['input1', 'input2', 'input3', 'output1']):
         print("Error: Missing parameters. Please provide input1, input2, input3, and output1.")
         sys.exit(1)
@@ -122,11 +620,20 @@ def main():
     params_file = args['input3']
     output_file = args['output1']
     try:
-       weights = load_matrix_file(weights_file)
-       layers = [{'weights': w, 'neurons': w.shape[0], 'inputs_count': w.shape[1], 'inputs': np.zeros(w.shape[1]), 'outputs': np.zeros(w.shape[0]), 'derivatives': np.zeros(w.shape[0])} for w in weights.values()]
+       dtype = DTYPES.get(args.get('dtype', 'float64'))
+       if dtype is None:
+           raise ValueError(f"неизвестный тип данных '{args['dtype']}'. Доступны: {', '.join(DTYPES)}")
+       if model_binary.is_binary_model(weights_file):
+           weights = dict(zip(*model_binary.load_model(weights_file)))
+       else:
+           weights = load_matrix_file(weights_file)
+       layers = [{'weights': w.astype(dtype), 'neurons': w.shape[0], 'inputs_count': w.shape[1], 'inputs': np.zeros(w.shape[1], dtype=dtype), 'outputs': np.zeros(w.shape[0], dtype=dtype), 'derivatives': np.zeros(w.shape[0], dtype=dtype)} for w in weights.values()]
 
-       data = load_matrix_file(data_file)
-       inputs, outputs = data['x'], data['y']
+       if is_binary_dataset(data_file):
+           inputs, outputs = load_binary_dataset(data_file)
+       else:
+           data = load_matrix_file(data_file)
+           inputs, outputs = data['x'].astype(dtype), data['y'].astype(dtype)
     except Exception as e:
        print(f"Не удалось считать данные : {e}")
        sys.exit(1)
@@ -138,15 +645,73 @@ def main():
     except Exception as e:
         print(f"Не удалось считать параметры: {e}")
         sys.exit(1)
+    report = args.get('report', 'summary')
+    if report not in REPORTS:
+        print(f"Ошибка, неизвестный вид отчета '{report}'. Доступны: {', '.join(REPORTS)}")
+        sys.exit(1)
+    fraction = params.get('validation', 0)
+    validation_count = math.ceil(len(inputs) * fraction) if 0 < fraction < 1 else 0
+    if fraction and not 0 < validation_count < len(inputs):
+        print(f"Ошибка, доля проверочной выборки должна быть в интервале (0, 1) и оставлять примеры для обучения: {fraction}")
+        sys.exit(1)
+    split = len(inputs) - validation_count
+    inputs, outputs, validation_inputs, validation_outputs = inputs[:split], outputs[:split], inputs[split:], outputs[split:]
+    validation_state = {'error': None}
+    batch_size = params.get('batch')
+    if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+        print(f"Ошибка, размер пакета должен быть целым положительным числом: {batch_size}")
+        sys.exit(1)
+    workers = params.get('workers', 1)
+    if not isinstance(workers, int) or workers < 1:
+        print(f"Ошибка, число процессов должно быть целым положительным числом: {workers}")
+        sys.exit(1)
+    optimizer_state = make_optimizer_state(layers, params.get('optimizer', 'sgd'))
+    history = load_checkpoint(args['resume'], layers, optimizer_state) if 'resume' in args else None
+    checkpoint_file = args.get('checkpoint', args.get('resume'))
+    checkpoint = None
+    if checkpoint_file:
+        every_epochs = params.get('checkpoint_epochs', 0)
+        every_seconds = params.get('checkpoint_seconds', 0 if every_epochs else 60)
+        checkpoint = make_checkpointer(checkpoint_file, every_epochs, every_seconds, optimizer_state)
+    profile = None
+    if 'metrics' in args:
+        if args['metrics'] not in METRICS_FORMATS:
+            print(f"Ошибка, неизвестный формат метрик '{args['metrics']}'. Доступны: {', '.join(METRICS_FORMATS)}")
+            sys.exit(1)
+        metrics_file = os.path.splitext(output_file)[0] + '.metrics.' + args['metrics']
+        try:
+            profile = make_profiler(metrics_file, args['metrics'])
+        except OSError as e:
+            print(f"Не удалось открыть файл метрик '{metrics_file}': {e}")
+            sys.exit(1)
     try:
-      history = train(layers, inputs, outputs, params['epoch'], params['alpha'], params['eps'])
+      schedule = make_schedule(params, params['epoch'])
+      optimizer = make_optimizer(params, layers, optimizer_state)
+      validation = make_early_stopping(validation_inputs, validation_outputs, params['eps'], params.get('patience', 0), params.get('min_delta', 0.0), validation_state) if validation_count else None
+      if workers > 1:
+          history = train_parallel(layers, inputs, outputs, params['epoch'], params['alpha'], params['eps'], batch_size or 32 * workers, workers, checkpoint, history, schedule, optimizer, profile, validation, params.get('worker_timeout', WORKER_TIMEOUT))
+      elif batch_size is None and optimizer is update_weights_batch:
+          history = train(layers, inputs, outputs, params['epoch'], params['alpha'], params['eps'], checkpoint, history, schedule, profile, validation)
+      else:
+          history = train_batched(layers, inputs, outputs, params['epoch'], params['alpha'], params['eps'], batch_size or 1, checkpoint, history, schedule, optimizer, profile, validation)
     except Exception as e:
       print(f"Ошибка во время обучения: {e}")
       sys.exit(1)
+    finally:
+      close_profiler(profile)
+    if report == 'samples':
+        print_results(layers, inputs, outputs)
+    elif report == 'summary':
+        print_summary(history, validation_state['error'], validation_count)
     try:
         with open(output_file, 'w') as file:
             file.write("\n".join(map(str, history)))
         print(f"Результат сохранен в файл {output_file}")
+        if profile:
+            print(f"Метрики обучения сохранены в файл {profile['path']}")
+        if 'output2' in args:
+            model_binary.write_model(args['output2'], list(weights), [layer['weights'] for layer in layers])
+            print(f"Обученная модель сохранена в файл {args['output2']}")
     except Exception as e:
       print(f"Не удалось записать вывод в '{output_file}': {e}")
       sys.exit(1)
@@ -0,0 +1,116 @@
+import sys
+import time
+import tracemalloc
+import graph_binary
+import nntask1
+import nntask2
+import nntask3
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def parse_args():
+    args = sys.argv[1:]
+    input_file1 = None
+    input_file2 = None
+    output_file = None
+    output_file1 = None
+    output_file2 = None
+    output_format = 'indent'
+    memory = 'process'
+    for arg in args:
+        if arg.startswith('input1='):
+            input_file1 = arg[7:]
+        elif arg.startswith('input2='):
+            input_file2 = arg[7:]
+        elif arg.startswith('output='):
+            output_file = arg[7:]
+        elif arg.startswith('output1='):
+            output_file1 = arg[8:]
+        elif arg.startswith('output2='):
+            output_file2 = arg[8:]
+        elif arg.startswith('format='):
+            output_format = arg[7:]
+        elif arg.startswith('memory='):
+            memory = arg[7:]
+    if not input_file1:
+        input_file1 = 'input.txt'
+    if not input_file2:
+        input_file2 = 'operations.txt'
+    if not output_file:
+        output_file = 'output.txt'
+    if memory not in ('process', 'stage'):
+        print(f"Ошибка: неизвестный режим учёта памяти '{memory}'. Доступны: process, stage.")
+        sys.exit(1)
+    return input_file1, input_file2, output_file, output_file1, output_file2, output_format, memory
+
+def process_peak_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+def run_stage(stages, name, func, *args):
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    stages.append((name, elapsed, (tracemalloc.get_traced_memory()[1] - base) / 2**20 if tracing else process_peak_mb()))
+    return result
+
+def parse_stage(input_file, output_file, output_format):
+    graph = nntask1.parse_graph(nntask1.read_arcs(input_file))
+    shared = {'names': list(graph['vertices']), 'from': graph['from'], 'to': graph['to'], 'order': graph['order']}
+    if output_file and output_format == 'binary':
+        graph_binary.write_graph(output_file, shared['names'], shared['from'], shared['to'], shared['order'])
+    elif output_file:
+        nntask1.write_json(graph, output_file, output_format)
+    return shared
+
+def serialize_stage(graph, output_file):
+    index = nntask2.build_index(graph['names'], graph['from'], graph['to'], graph['order'])
+    has_cycle, _ = nntask2.cycle(index)
+    if has_cycle:
+        print("Ошибка: граф содержит циклы.")
+        sys.exit(1)
+    if output_file:
+        nntask2.write_function(output_file, index)
+
+def evaluate_stage(graph, operations_file, output_file):
+    vertices, arcs = set(graph['names']), graph_binary.ArcView(graph)
+    operations = nntask3.load_operations(operations_file)
+    result = nntask3.evaluate_function(vertices, arcs, operations)
+    nntask3.write_output(output_file, result)
+    return result
+
+def format_mb(value):
+    return '-' if value is None else f'{value:.1f}'
+
+def print_report(stages, memory):
+    title = 'пик этапа, МБ' if memory == 'stage' else 'макс. RSS, МБ'
+    print(f"{'этап':<12} {'время, с':>10} {title:>16}")
+    for name, elapsed, peak in stages:
+        print(f"{name:<12} {elapsed:>10.4f} {format_mb(peak):>16}")
+    total = max(stage[2] for stage in stages) if memory == 'stage' else stages[-1][2]
+    print(f"{'всего':<12} {sum(stage[1] for stage in stages):>10.4f} {format_mb(total):>16}")
+    if memory == 'process':
+        print("Память: накопленный максимум RSS процесса; пик каждого этапа отдельно: memory=stage (замедляет выполнение).")
+
+def main():
+    input_file1, input_file2, output_file, output_file1, output_file2, output_format, memory = parse_args()
+    stages = []
+    if memory == 'stage':
+        tracemalloc.start()
+    graph = run_stage(stages, 'nntask1', parse_stage, input_file1, output_file1, output_format)
+    run_stage(stages, 'nntask2', serialize_stage, graph, output_file2)
+    run_stage(stages, 'nntask3', evaluate_stage, graph, input_file2, output_file)
+    print(f"Результат сохранён в '{output_file}'")
+    print_report(stages, memory)
+
+if __name__ == '__main__':
+    main()